@@ -0,0 +1,134 @@
+import asyncio
+import io
+import sys
+
+STREAM_PATH = '/elevator/stream'
+
+
+def create_asgi_app(flask_app, loop):
+    """
+    Creates an ASGI application serving the same routes as the Flask app.
+    The simulation loop runs as a task on the server's event loop and /elevator/stream is served natively,
+    so an open stream costs a coroutine instead of a thread. All other routes are handed to the Flask app
+    in a worker thread, so a slow export or bulk request does not stall the streams.
+    :param flask_app: The Flask app providing the /elevator routes.
+    :param loop: The simulation loop that is run and streamed.
+    """
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await run_lifespan(loop, receive, send)
+        elif scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+            await stream_frames(loop.broadcaster, receive, send)
+        elif scope['type'] == 'http':
+            await call_wsgi(flask_app.wsgi_app, scope, receive, send)
+
+    return app
+
+
+async def run_lifespan(loop, receive, send):
+    task = None
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            task = asyncio.create_task(loop.run_async())
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if task is not None:
+                task.cancel()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def stream_frames(broadcaster, receive, send):
+    """Sends every frame published by the broadcaster as a server-sent event until the client disconnects."""
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'text/event-stream; charset=utf-8'), (b'cache-control', b'no-cache')],
+    })
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    sequence = broadcaster.add_subscriber()
+    try:
+        while True:
+            next_frame = asyncio.ensure_future(broadcaster.wait_for_frame_async(sequence))
+            await asyncio.wait({next_frame, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_frame.cancel()
+                return
+            sequence, frame = next_frame.result()
+            await send({'type': 'http.response.body', 'body': frame.encode('utf-8'), 'more_body': True})
+    finally:
+        broadcaster.remove_subscriber()
+        disconnected.cancel()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def call_wsgi(wsgi_app, scope, receive, send):
+    """Runs a WSGI application for a single ASGI http request."""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+    # the route and the body it produces may be slow, running them off the event loop keeps the streams flowing
+    status, headers, content = await asyncio.to_thread(run_wsgi, wsgi_app, build_environ(scope, body))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': content})
+
+
+def run_wsgi(wsgi_app, environ):
+    """Calls a WSGI application and returns its status, headers and complete body."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    result = wsgi_app(environ, start_response)
+    try:
+        content = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], content
+
+
+def build_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        # routes run in worker threads, several of them at once
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+            continue
+        key = f'HTTP_{name}'
+        # repeated headers are folded into one comma separated value
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
@@ -0,0 +1,94 @@
+import json
+import os
+from typing import NamedTuple
+
+from app.building.floorcategory import FloorCategory
+from app.people.roledistribution import resolve_role_distribution
+
+
+class BuildingConfig(NamedTuple):
+    """A building and its population as read from a config file. Settings the file leaves out are None."""
+    floor_definition: dict
+    role_distribution: dict
+    population_size: int = None
+    max_load: int = None
+    car_count: int = None
+
+
+def load_building_config(path):
+    """
+    Reads a building from a JSON or TOML file. Floors are given as ranges sharing a category, so a tower
+    with hundreds of floors takes a handful of lines:
+
+        population = 100000
+        cars = 8
+
+        [[floors]]
+        category = "ENTRANCE"
+        from = 0
+
+        [[floors]]
+        category = "OFFICES"
+        from = 1
+        to = 120
+
+        [roles]
+        OfficeRole = 40
+
+    :param path: A .toml file or a .json file with the same structure.
+    :return: The BuildingConfig. Without a roles table the default role distribution is used.
+    """
+    if os.path.splitext(path)[1] == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("TOML building configs need Python 3.11 or newer, use a JSON config instead") from None
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+    unknown = set(data) - {"floors", "roles", "population", "max_load", "cars"}
+    if unknown:
+        raise ValueError(f"Unknown building settings: {', '.join(sorted(unknown))}")
+    return BuildingConfig(
+        floor_definition=parse_floors(data.get("floors", [])),
+        role_distribution=resolve_role_distribution(data.get("roles")),
+        population_size=data.get("population"),
+        max_load=data.get("max_load"),
+        car_count=data.get("cars"),
+    )
+
+
+def parse_floors(ranges):
+    """Expands floor ranges into a floor definition. The ranges have to cover the floors from 0 up without gaps."""
+    floor_definition = {}
+    for floor_range in ranges:
+        category = parse_category(floor_range["category"])
+        first = floor_range["from"]
+        last = floor_range.get("to", first)
+        if last < first:
+            raise ValueError(f"Floor range {first} to {last} is empty")
+        for floor in range(first, last + 1):
+            if floor in floor_definition:
+                raise ValueError(f"Floor {floor} is defined twice")
+            floor_definition[floor] = category
+
+    # the elevator addresses floors by index, so they have to be numbered 0 to n - 1
+    if sorted(floor_definition) != list(range(len(floor_definition))):
+        missing = sorted(set(range(max(floor_definition, default=0) + 1)) - set(floor_definition))
+        raise ValueError(f"Floors {missing} are not defined")
+    if FloorCategory.ENTRANCE not in floor_definition.values():
+        raise ValueError("The building needs at least one ENTRANCE floor")
+    return dict(sorted(floor_definition.items()))
+
+
+def parse_category(name):
+    """Accepts a FloorCategory by its name such as OFFICES or by its value such as General Offices."""
+    if name in FloorCategory.__members__:
+        return FloorCategory[name]
+    try:
+        return FloorCategory(name)
+    except ValueError:
+        raise ValueError(f"Unknown floor category: {name}") from None
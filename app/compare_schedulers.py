@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import tempfile
+
+from app.simulation.engine import POPULATION_CLASSES, SCHEDULER_STRATEGIES, create_engine
+from app.simulation.scheduler_comparison import compare_strategies
+from app.simulation.trace import TraceRecorder
+
+COLUMNS = [
+    "scheduler", "rides", "delivered", "moves", "moves_per_passenger",
+    "average_wait", "wait_p90", "average_journey", "decision_us_per_tick",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replays the same traffic with every scheduling strategy.")
+    parser.add_argument("--trace", help="Recorded trace to replay. Without one, a seeded run is recorded first.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the recorded run.")
+    parser.add_argument("--days", type=float, default=1, help="Number of virtual days of the recorded run.")
+    parser.add_argument("--population", type=int, default=100, help="Number of simulated people of the recorded run.")
+    parser.add_argument("--population-mode", choices=POPULATION_CLASSES.keys(), default="vectorized",
+                        help="How the population of the recorded run is evaluated.")
+    parser.add_argument("--cars", type=int, default=1, help="Number of elevator cars in the group.")
+    parser.add_argument("--max-load", type=int, default=1200, help="Maximum load of the cabin in kg.")
+    parser.add_argument("--scheduler", action="append", choices=SCHEDULER_STRATEGIES.keys(),
+                        help="Strategy to compare, may be repeated. All registered strategies by default.")
+    return parser.parse_args()
+
+
+def record_trace(path, args):
+    with TraceRecorder(path) as recorder:
+        engine = create_engine(population_size=args.population, max_load=args.max_load, car_count=args.cars,
+                               population_class=POPULATION_CLASSES[args.population_mode],
+                               seed=args.seed, recorder=recorder, log_size=0)
+        engine.run_days(args.days)
+
+
+def format_cell(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+
+def main():
+    args = parse_args()
+    names = args.scheduler or list(SCHEDULER_STRATEGIES)
+    strategies = {name: SCHEDULER_STRATEGIES[name] for name in names}
+
+    trace_path = args.trace
+    if trace_path is None:
+        descriptor, trace_path = tempfile.mkstemp(suffix=".trace")
+        os.close(descriptor)
+        record_trace(trace_path, args)
+    try:
+        rows = compare_strategies(trace_path, strategies, max_load=args.max_load, car_count=args.cars)
+    finally:
+        if args.trace is None:
+            os.remove(trace_path)
+
+    print("\t".join(COLUMNS))
+    for row in rows:
+        print("\t".join(format_cell(row[column]) for column in COLUMNS))
+    print(f"Replayed {rows[0]['rides']} ride(s) per strategy.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,26 +14,34 @@ class Elevator:
         self.load = 0
         # state of the elevator doors
         self.doors_open = False
+        # increased on every change of the state above
+        self.version = 0
 
     def move_up(self):
         if (self.position == self.FLOOR_COUNT):
             raise SafetyError("Elevator is at topmost floor! Moving up is not permitted!")
         # upadate position
         self.position += 1
+        self.version += 1
 
     def move_down(self):
         if (self.position == 0):
             raise SafetyError("Elevator is at bottommost floor! Moving down is not permitted!")
         # update position
         self.position -= 1
+        self.version += 1
 
     def close_doors(self):
         if (self.load > self.MAX_LOAD):
             raise SafetyError("Current elevator weight exceeds maximum permitted load!")
-        self.doors_open = False
+        if (self.doors_open):
+            self.doors_open = False
+            self.version += 1
 
     def open_doors(self):
-        self.doors_open = True
+        if (not self.doors_open):
+            self.doors_open = True
+            self.version += 1
 
     def get_door_state(self):
         return self.doors_open
@@ -49,12 +57,17 @@ class Elevator:
 
     def inc_load(self, amount):
         self.load += amount
+        self.version += 1
         return
 
     def dec_load(self, amount):
         self.load -= amount
+        self.version += 1
         return
 
+    def get_version(self):
+        return self.version
+
     def get_position(self):
         return self.position
 
@@ -0,0 +1,96 @@
+# This class represents a bank of elevator cars that share the ride requests of a building
+from app.elevator.elevator import Elevator
+from app.elevator.scheduling.dispatcher import Dispatcher
+from app.elevator.scheduling.elevator_scheduler import Scheduler
+
+
+class Car:
+    """A single elevator of a group together with the scheduler driving it."""
+
+    def __init__(self, index, elevator, scheduler):
+        self.index = index
+        self.elevator = elevator
+        self.scheduler = scheduler
+
+
+class ElevatorGroup:
+    def __init__(self, floor_count, max_load, car_count=1, dispatcher=None, clock=None, scheduler_class=Scheduler):
+        self.FLOOR_COUNT = floor_count
+        self.cars = []
+        for index in range(car_count):
+            elevator = Elevator(floor_count, max_load)
+            self.cars.append(Car(index, elevator, scheduler_class(elevator, clock)))
+        self.dispatcher = dispatcher if dispatcher is not None else Dispatcher()
+
+    def handle_request(self, start, end, role=None, person_id=None):
+        """Dispatches a ride request to one of the cars and returns the index of the chosen car."""
+        index = self.dispatcher.select_car(self.cars, start, end) if len(self.cars) > 1 else 0
+        self.cars[index].scheduler.handle_request(start, end, role, person_id)
+        return index
+
+    def pop_completed_trips(self):
+        """Returns the Passenger records all cars delivered since the last call."""
+        return [passenger for car in self.cars for passenger in car.scheduler.pop_completed_trips()]
+
+    def get_cars(self):
+        return self.cars
+
+    def get_car(self, index):
+        return self.cars[index]
+
+    def get_car_count(self):
+        return len(self.cars)
+
+    def has_pending_requests(self):
+        return any(car.scheduler.has_pending_requests() for car in self.cars)
+
+    def any_doors_open(self):
+        return any(car.elevator.get_door_state() for car in self.cars)
+
+    def get_waiting_counts(self):
+        """Returns the number of passengers waiting at each floor, summed over all cars and both directions."""
+        # the schedulers keep their counts current, sampling only adds one array per car
+        waiting = self.cars[0].scheduler.get_waiting_counts().copy()
+        for car in self.cars[1:]:
+            waiting += car.scheduler.get_waiting_counts()
+        return waiting
+
+    def get_loads(self):
+        return [car.elevator.get_load() for car in self.cars]
+
+    def get_cabin_version(self):
+        # the sum of increasing versions changes whenever any of them does
+        return sum(car.elevator.get_version() for car in self.cars)
+
+    def get_scheduler_version(self):
+        return sum(car.scheduler.get_version() for car in self.cars)
+
+    def get_cabin_states(self):
+        return [dict(car.elevator.get_state(), car=car.index) for car in self.cars]
+
+    def get_scheduler_states(self):
+        return [dict(car.scheduler.get_state(), car=car.index) for car in self.cars]
+
+    def __repr__(self):
+        return f"ElevatorGroup({self.FLOOR_COUNT}, {len(self.cars)})"
+
+    # string representation of all shafts side by side followed by the schedulers of each car
+    def __str__(self):
+        if (len(self.cars) == 1):
+            car = self.cars[0]
+            return f"{car.elevator}\n{car.scheduler}"
+
+        string = 'ELEVATORS:\n'
+        string += 'LOAD: ' + ', '.join(f'{car.elevator.get_load()} kg' for car in self.cars) + '\n'
+        for floor in range(self.FLOOR_COUNT, -1, -1):
+            shafts = []
+            for car in self.cars:
+                # select symbol dependant on door state
+                if (car.elevator.get_position() == floor):
+                    shafts.append('[ ]' if car.elevator.get_door_state() else '[X]')
+                else:
+                    shafts.append(' | ')
+            string += f"{floor:<3} {' '.join(shafts)}\n"
+        for car in self.cars:
+            string += f"\nCAR {car.index} {car.scheduler}"
+        return string
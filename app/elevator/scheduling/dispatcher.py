@@ -0,0 +1,42 @@
+# This class assigns incoming ride requests to one of the cars of an elevator group
+
+# Cost of a stop in floors travelled, a stop keeps the doors open for two iterations
+STOP_COST = 2
+
+
+class Dispatcher:
+    """Assigns each ride request to the car with the lowest estimated time of arrival at the start floor."""
+
+    def select_car(self, cars, start, end):
+        """Returns the index of the car that should serve the ride from start to end."""
+        costs = [self.estimate_arrival(car.scheduler, start, end) for car in cars]
+        return costs.index(min(costs))
+
+    def estimate_arrival(self, scheduler, start, end):
+        """Estimates how many floors a car travels, stops included, before it can pick up at the start floor."""
+        position = scheduler.get_position()
+        # idle cars drive straight to the caller
+        if (not scheduler.has_pending_requests()):
+            return abs(position - start)
+
+        going_up = end > start
+        if (scheduler.is_going_up()):
+            # caller is ahead of the car and wants to go the same way
+            if (going_up and start >= position):
+                distance = start - position
+            # otherwise the car turns at the highest pending floor first
+            else:
+                turn = max(scheduler.get_highest_pending_floor(), position)
+                distance = (turn - position) + abs(turn - start)
+        else:
+            if ((not going_up) and start <= position):
+                distance = position - start
+            else:
+                turn = min(scheduler.get_lowest_pending_floor(), position)
+                distance = (position - turn) + abs(start - turn)
+
+        cost = distance + scheduler.get_pending_floor_count() * STOP_COST
+        # a full car has to drop people off before it can take anybody
+        if (not scheduler.not_full()):
+            cost += scheduler.get_floor_count()
+        return cost
@@ -2,28 +2,50 @@
 
 from collections import deque
 
+import numpy as np
+
 from app.elevator.elevator import Elevator
+from app.elevator.scheduling.passenger import Passenger
 from app.elevator.scheduling.scheduler_directions import Directions
 from app.elevator.scheduling.scheduler_moves import Moves
+from app.elevator.scheduling.scheduler_strategy import SchedulerStrategy
 
 # Weight of an average person
 PERSON_WEIGHT = 80
 
 
-class Scheduler:
-    def __init__(self, elevator: Elevator):
+class Scheduler(SchedulerStrategy):
+    """The default SCAN strategy: serves every request in the current direction, then chases the outmost request."""
+
+    def __init__(self, elevator: Elevator, clock=None):
         # elevator data
         self.FLOOR_COUNT = elevator.get_floor_count()
         self.MAX_LOAD = elevator.get_max_load()
         self.elevator = elevator
+        # clock used to timestamp passengers, without one all durations are 0
+        self.clock = clock
 
         # scheduling data
         self.is_moving_upwards = True
+        # passengers waiting at each floor and passengers in the cabin per destination floor
         self.up_requests = [deque([]) for _ in range(self.FLOOR_COUNT + 1)]
         self.down_requests = [deque([]) for _ in range(self.FLOOR_COUNT + 1)]
-        self.stop_requests = [0] * (self.FLOOR_COUNT + 1)
+        self.stop_requests = [[] for _ in range(self.FLOOR_COUNT + 1)]
+        # state of each floor as returned by get_state, None once the floor changed
+        self.floor_states = [None] * (self.FLOOR_COUNT + 1)
+        # passengers waiting at each floor in either direction, kept up to date so sampling never walks the floors
+        self.waiting = np.zeros(self.FLOOR_COUNT + 1, dtype=np.int64)
+        # index of floors with pending requests, one bit per floor
+        self.up_floors = 0
+        self.down_floors = 0
+        self.stop_floors = 0
         # chase mode for scan
         self.is_chasing = False
+        # increased whenever the queues change
+        self.version = 0
+
+        # delivered passengers not yet collected
+        self.completed_trips = []
 
     def get_next_move(self):
         # rest if no requests
@@ -86,85 +108,136 @@ class Scheduler:
 
     def add_up_destinations(self):
         while self.up_requests[self.elevator.get_position()] and self.not_full():
-            destination = self.up_requests[self.elevator.get_position()].popleft()
-            self.stop_requests[destination] += 1
+            self.board(self.up_requests[self.elevator.get_position()].popleft())
 
             # ----------------------------------------------------------------------
             #   Update elevator weight model:
             self.elevator.inc_load(PERSON_WEIGHT)
         # -----------------------------------------------------------------------
+        self.index_floor(self.elevator.get_position())
 
     def add_down_destinations(self):
         while self.down_requests[self.elevator.get_position()] and self.not_full():
-            destination = self.down_requests[self.elevator.get_position()].popleft()
-            self.stop_requests[destination] += 1
+            self.board(self.down_requests[self.elevator.get_position()].popleft())
 
             # ----------------------------------------------------------------------
             #   Update elevator weight model:
             self.elevator.inc_load(PERSON_WEIGHT)
         # -----------------------------------------------------------------------
+        self.index_floor(self.elevator.get_position())
+
+    def board(self, passenger):
+        passenger.board_time = self.get_time()
+        self.waiting[passenger.origin] -= 1
+        self.stop_requests[passenger.destination].append(passenger)
+        self.index_floor(passenger.destination)
 
     def handle_down_destinations(self):
-        # --------------------------------------------------------------------------
-        #   Update elevator weight model:
-        self.elevator.dec_load(
-            self.stop_requests[self.elevator.get_position()] * PERSON_WEIGHT)
-        # ---------------------------------------------------------------------------
-        self.stop_requests[self.elevator.get_position()] = 0
+        self.drop_off_riders()
         self.add_down_destinations()
 
     def handle_up_destinations(self):
+        self.drop_off_riders()
+        self.add_up_destinations()
+
+    def drop_off_riders(self):
+        riders = self.stop_requests[self.elevator.get_position()]
         # --------------------------------------------------------------------------
         #   Update elevator weight model:
-        self.elevator.dec_load(
-            self.stop_requests[self.elevator.get_position()] * PERSON_WEIGHT)
+        self.elevator.dec_load(len(riders) * PERSON_WEIGHT)
         # ---------------------------------------------------------------------------
-        self.stop_requests[self.elevator.get_position()] = 0
-        self.add_up_destinations()
+        now = self.get_time()
+        for passenger in riders:
+            passenger.arrival_time = now
+        self.completed_trips.extend(riders)
+        self.stop_requests[self.elevator.get_position()] = []
+        self.floor_states[self.elevator.get_position()] = None
+
+    def pop_completed_trips(self):
+        """Returns the Passenger records delivered since the last call."""
+        completed_trips, self.completed_trips = self.completed_trips, []
+        return completed_trips
+
+    def get_time(self):
+        return self.clock.get_elapsed_virtual_seconds() if self.clock is not None else 0
 
     def preview(self, move_up):
-        result = False
         # preview requests for travelling up or leaving
         if (move_up):
-            for floor in range(self.elevator.get_position(), self.FLOOR_COUNT + 1):
-                result |= bool(self.up_requests[floor])
-                result |= self.stop_requests[floor] != 0
-            return result
+            return ((self.up_floors | self.stop_floors) >> self.elevator.get_position()) != 0
         # preview requests for travelling down or leaving
         else:
-            for floor in range(self.elevator.get_position()):
-                result |= bool(self.down_requests[floor])
-                result |= self.stop_requests[floor] != 0
-            return result
+            below = (1 << self.elevator.get_position()) - 1
+            return ((self.down_floors | self.stop_floors) & below) != 0
 
     def get_outmost_request(self, move_up):
+        position = self.elevator.get_position()
         if (move_up):
-            outmost = self.elevator.get_position()
-            for floor in range(self.elevator.get_position(), self.FLOOR_COUNT + 1):
-                if (self.down_requests[floor] and floor > outmost):
-                    outmost = floor
-            return outmost
+            # highest floor with a down request
+            highest = self.down_floors.bit_length() - 1
+            return highest if highest > position else position
         else:
-            outmost = self.elevator.get_position()
-            for floor in range(0, self.elevator.get_position()):
-                if (self.up_requests[floor] and floor < outmost):
-                    outmost = floor
-            return outmost
+            # lowest floor with an up request
+            lowest = (self.up_floors & -self.up_floors).bit_length() - 1
+            return lowest if 0 <= lowest < position else position
+
+    def get_position(self):
+        return self.elevator.get_position()
+
+    def get_floor_count(self):
+        return self.FLOOR_COUNT
+
+    def is_going_up(self):
+        return self.is_moving_upwards
 
     def has_pending_requests(self):
-        result = False
-        for floor in range(self.FLOOR_COUNT + 1):
-            result |= bool(self.up_requests[floor])
-            result |= bool(self.down_requests[floor])
-            result |= self.stop_requests[floor] != 0
-        return result
-
-    def handle_request(self, start, end):
+        return (self.up_floors | self.down_floors | self.stop_floors) != 0
+
+    def get_pending_floor_count(self):
+        """Returns the number of floors the elevator still has to stop at for pickups or drop-offs."""
+        return (self.up_floors | self.down_floors | self.stop_floors).bit_count()
+
+    def get_highest_pending_floor(self):
+        """Returns the highest floor with any pending request, or None if there is none."""
+        pending = self.up_floors | self.down_floors | self.stop_floors
+        return pending.bit_length() - 1 if pending else None
+
+    def get_lowest_pending_floor(self):
+        """Returns the lowest floor with any pending request, or None if there is none."""
+        pending = self.up_floors | self.down_floors | self.stop_floors
+        return (pending & -pending).bit_length() - 1 if pending else None
+
+    def handle_request(self, start, end, role=None, person_id=None):
         # log move request
+        passenger = Passenger(start, end, person_id, role, self.get_time())
         if (end > start):
-            self.up_requests[start].append(end)
+            self.up_requests[start].append(passenger)
         else:
-            self.down_requests[start].append(end)
+            self.down_requests[start].append(passenger)
+        self.waiting[start] += 1
+        self.index_floor(start)
+
+    def index_floor(self, floor):
+        """Updates the pending request bits of a floor after its queues or stop requests changed."""
+        self.version += 1
+        self.floor_states[floor] = None
+        bit = 1 << floor
+        self.up_floors = self.up_floors | bit if self.up_requests[floor] else self.up_floors & ~bit
+        self.down_floors = self.down_floors | bit if self.down_requests[floor] else self.down_floors & ~bit
+        self.stop_floors = self.stop_floors | bit if self.stop_requests[floor] else self.stop_floors & ~bit
+
+    def get_version(self):
+        return self.version
+
+    def get_queue_lengths(self):
+        """Returns (floor, waiting up, waiting down, riding to the floor) for every floor."""
+        return [
+            (floor, len(self.up_requests[floor]), len(self.down_requests[floor]), len(self.stop_requests[floor]))
+            for floor in range(self.FLOOR_COUNT + 1)
+        ]
+
+    def get_waiting_counts(self):
+        return self.waiting
 
     def not_full(self):
         return self.elevator.get_load() + PERSON_WEIGHT <= self.MAX_LOAD
@@ -178,9 +251,9 @@ class Scheduler:
         string = 'SCHEDULER:\n'
         string += format_string.format('FLOOR', 'UP_REQUESTS', 'DOWN_REQUESTS', 'STOP_REQUESTS')
         for floor in range(self.FLOOR_COUNT, -1, -1):
-            up = ', '.join(map(str, self.up_requests[floor]))
-            down = ', '.join(map(str, self.down_requests[floor]))
-            req_count = self.stop_requests[floor]
+            up = ', '.join(str(passenger.destination) for passenger in self.up_requests[floor])
+            down = ', '.join(str(passenger.destination) for passenger in self.down_requests[floor])
+            req_count = len(self.stop_requests[floor])
             stop = req_count if req_count > 0 else ''
             string += format_string.format(floor, up, down, stop)
         return string
@@ -191,13 +264,18 @@ class Scheduler:
             "floors": []
         }
 
+        # only floors that changed since the last call are built again, the others are shared with earlier states
+        floor_states = self.floor_states
         for floor in range(self.FLOOR_COUNT, -1, -1):
-            floor_state = {
-                "floor": floor,
-                "up_requests": list(self.up_requests[floor]),
-                "down_requests": list(self.down_requests[floor]),
-                "stop_requests": self.stop_requests[floor]
-            }
+            floor_state = floor_states[floor]
+            if floor_state is None:
+                floor_state = {
+                    "floor": floor,
+                    "up_requests": [passenger.destination for passenger in self.up_requests[floor]],
+                    "down_requests": [passenger.destination for passenger in self.down_requests[floor]],
+                    "stop_requests": len(self.stop_requests[floor])
+                }
+                floor_states[floor] = floor_state
             scheduler_state["floors"].append(floor_state)
 
         return scheduler_state
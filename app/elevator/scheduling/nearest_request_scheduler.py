@@ -0,0 +1,58 @@
+# This class schedules an elevator by always serving the closest floor with a pending request
+
+from app.elevator.scheduling.elevator_scheduler import Scheduler
+from app.elevator.scheduling.scheduler_moves import Moves
+
+
+class NearestRequestScheduler(Scheduler):
+    """
+    Nearest-request-first strategy. It shares the request queues and passenger bookkeeping of the SCAN
+    scheduler, but heads for whichever floor with a pickup or drop-off is closest and boards everybody
+    waiting there regardless of their direction. Ties keep the current direction of travel.
+    """
+
+    def get_next_move(self):
+        # rest if no requests
+        if (not self.has_pending_requests()):
+            return Moves.STAY
+
+        position = self.elevator.get_position()
+        if (self.stop_requests[position]
+                or ((self.up_requests[position] or self.down_requests[position]) and self.not_full())):
+            self.handle_all_destinations()
+            return Moves.STOP
+
+        target = self.get_nearest_floor()
+        self.is_moving_upwards = target > position
+        return Moves.UP if self.is_moving_upwards else Moves.DOWN
+
+    def handle_all_destinations(self):
+        self.drop_off_riders()
+        # board the callers travelling in the current direction first
+        if (self.is_moving_upwards):
+            self.add_up_destinations()
+            self.add_down_destinations()
+        else:
+            self.add_down_destinations()
+            self.add_up_destinations()
+
+    def get_nearest_floor(self):
+        """Returns the closest other floor with a drop-off, or with a pickup if the cabin has room."""
+        position = self.elevator.get_position()
+        pending = self.stop_floors
+        if (self.not_full()):
+            pending |= self.up_floors | self.down_floors
+        pending &= ~(1 << position)
+
+        above = pending >> (position + 1)
+        below = pending & ((1 << position) - 1)
+        # lowest pending floor above and highest pending floor below the car
+        up_distance = (above & -above).bit_length() if above else None
+        down_distance = position - (below.bit_length() - 1) if below else None
+        if (up_distance is None):
+            return position - down_distance
+        if (down_distance is None or up_distance < down_distance):
+            return position + up_distance
+        if (down_distance < up_distance):
+            return position - down_distance
+        return position + up_distance if self.is_moving_upwards else position - down_distance
@@ -0,0 +1,29 @@
+# This class records a single passenger from their request until they leave the cabin
+
+
+class Passenger:
+    """
+    A ride request waiting at its origin floor or riding in the cabin. Slots keep the record compact,
+    so queueing a passenger costs one small object instead of a dictionary or several tuples.
+    """
+    __slots__ = ("origin", "destination", "person_id", "role", "request_time", "board_time", "arrival_time")
+
+    def __init__(self, origin, destination, person_id=None, role=None, request_time=0):
+        self.origin = origin
+        self.destination = destination
+        self.person_id = person_id
+        self.role = role
+        self.request_time = request_time
+        self.board_time = None
+        self.arrival_time = None
+
+    def get_wait_time(self):
+        """Returns the virtual seconds from the request until boarding."""
+        return self.board_time - self.request_time
+
+    def get_journey_time(self):
+        """Returns the virtual seconds from the request until arriving at the destination."""
+        return self.arrival_time - self.request_time
+
+    def __repr__(self):
+        return f"Passenger({self.origin} -> {self.destination}, {self.person_id})"
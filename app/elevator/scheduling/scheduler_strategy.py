@@ -0,0 +1,72 @@
+# This class defines the interface every elevator scheduling strategy implements
+
+from abc import ABC, abstractmethod
+
+
+class SchedulerStrategy(ABC):
+    """
+    Decides the moves of a single elevator car. The loop, the elevator group and its dispatcher only talk to a
+    car's scheduler through these methods, so strategies can be swapped without touching any of them.
+    """
+
+    @abstractmethod
+    def handle_request(self, start, end, role=None, person_id=None):
+        """Queues a ride request from start to end that was assigned to this car."""
+
+    @abstractmethod
+    def get_next_move(self):
+        """Returns the Moves value the car carries out in the current tick."""
+
+    @abstractmethod
+    def has_pending_requests(self):
+        """Returns whether any passenger is still waiting for or riding in the car."""
+
+    @abstractmethod
+    def pop_completed_trips(self):
+        """Returns the Passenger records delivered since the last call."""
+
+    @abstractmethod
+    def get_version(self):
+        """Returns a number that increases whenever the state returned by get_state changes."""
+
+    @abstractmethod
+    def get_queue_lengths(self):
+        """Returns (floor, waiting up, waiting down, riding to the floor) for every floor."""
+
+    @abstractmethod
+    def get_waiting_counts(self):
+        """Returns the passengers waiting at each floor as an array, maintained as requests arrive and board."""
+
+    @abstractmethod
+    def get_state(self):
+        """Returns the queued requests of every floor as a JSON serializable dictionary."""
+
+    # what the dispatcher needs to estimate when the car can pick up a new request
+
+    @abstractmethod
+    def get_position(self):
+        """Returns the floor the car is at."""
+
+    @abstractmethod
+    def get_floor_count(self):
+        """Returns the highest floor the car serves."""
+
+    @abstractmethod
+    def is_going_up(self):
+        """Returns whether the car currently serves requests in upward direction."""
+
+    @abstractmethod
+    def get_pending_floor_count(self):
+        """Returns the number of floors the car still has to stop at for pickups or drop-offs."""
+
+    @abstractmethod
+    def get_highest_pending_floor(self):
+        """Returns the highest floor with any pending request, or None if there is none."""
+
+    @abstractmethod
+    def get_lowest_pending_floor(self):
+        """Returns the lowest floor with any pending request, or None if there is none."""
+
+    @abstractmethod
+    def not_full(self):
+        """Returns whether another passenger fits into the car."""
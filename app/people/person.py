@@ -1,12 +1,18 @@
+import random
 import uuid
 
 
 class Person:
     def __init__(self, role):
         self.role = role
-        self.employee_id = uuid.uuid4()
+        # drawn from the seedable random module instead of uuid4, so seeded runs get the same ids.
+        # Only the random bits are drawn here, the UUID is built when the id is first needed.
+        self.employee_bits = random.getrandbits(128)
+        self.employee_id = None
 
     def get_employee_id(self):
+        if self.employee_id is None:
+            self.employee_id = uuid.UUID(int=self.employee_bits, version=4)
         return self.employee_id
 
     def get_next_request(self, clock):
@@ -0,0 +1,40 @@
+import heapq
+
+from app.people.population import Population
+
+
+class PlannedPopulation(Population):
+    """
+    A population that merges the lazily generated trip plans of all people in a heap keyed on the
+    virtual minute of their next trip, so each tick only touches people whose trip is due.
+    Plans draw punctuality once per planned minute and skip minutes further than PUNCTUALITY_SIGMAS from any
+    schedule entry, so the ride distribution approximates the default population rather than matching it.
+    """
+
+    def __init__(self, population_size, building, role_distribution):
+        super().__init__(population_size, building, role_distribution)
+        self.plans = None
+        # entries are (minute, person index, start, end)
+        self.due_trips = []
+
+    def start_plans(self, current_time_minutes):
+        self.plans = [person.role.plan_trips(current_time_minutes) for person in self.population]
+        for index, plan in enumerate(self.plans):
+            minute, start, end = next(plan)
+            self.due_trips.append((minute, index, start, end))
+        heapq.heapify(self.due_trips)
+
+    def get_requests(self, clock):
+        current_time_minutes = clock.get_virtual_minutes_since_epoch()
+        if self.plans is None:
+            self.start_plans(current_time_minutes)
+
+        requests = []
+        while self.due_trips and self.due_trips[0][0] <= current_time_minutes:
+            _, index, start, end = heapq.heappop(self.due_trips)
+            if start is not None:
+                person = self.population[index]
+                requests.append((start, end, person.get_employee_id(), person.role.__class__.__name__))
+            minute, start, end = next(self.plans[index])
+            heapq.heappush(self.due_trips, (minute, index, start, end))
+        return requests
@@ -1,6 +1,7 @@
-import random
 from typing import List
 
+import numpy as np
+
 from app.people.person import Person
 
 
@@ -11,22 +12,44 @@ class Population:
         self.population_size = population_size
         self.role_distribution = role_distribution
         self.population = self.init_population()
+        # people keep their roles, so the composition never changes
+        self.version = 0
 
     def init_population(self):
         """Initializes the population with role objects instantiated according to the defined distribution."""
-        population = []
         role_classes = list(self.role_distribution.keys())  # Extract role class references
-        probabilities = list(self.role_distribution.values())  # Corresponding probabilities
+        weights = np.array(list(self.role_distribution.values()), dtype=float)  # Corresponding probabilities
 
-        for _ in range(self.population_size):
-            assigned_role_class = random.choices(role_classes, weights=probabilities, k=1)[0]
-            population.append(Person(assigned_role_class(self.building)))
+        # the roles of the whole population are drawn at once instead of one random.choices call per person
+        # index into the role distribution of every person
+        self.role_assignments = np.random.choice(
+            len(role_classes), size=self.population_size, p=weights / weights.sum()
+        )
+        roles = [None] * self.population_size
+        for index, role_class in enumerate(role_classes):
+            members = np.flatnonzero(self.role_assignments == index)
+            for member, role in zip(members.tolist(), role_class.create_many(self.building, members.size)):
+                roles[member] = role
 
-        return population
+        return [Person(role) for role in roles]
 
     def get_people(self) -> List[Person]:
         return self.population
 
+    def get_requests(self, clock):
+        """Collects the ride requests of everybody who wants to move as (start, end, person_id, role) rows."""
+        requests = []
+        for person in self.population:
+            request = person.get_next_request(clock)
+            if request is None:
+                continue
+            start, end = request
+            requests.append((start, end, person.get_employee_id(), person.role.__class__.__name__))
+        return requests
+
+    def get_version(self):
+        return self.version
+
     def get_population(self):
         population_summary = {role.__name__: 0 for role in self.role_distribution.keys()}
         for person in self.population:
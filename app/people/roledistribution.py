@@ -15,3 +15,14 @@ ROLE_DISTRIBUTION = {
     SecurityRole: 5,
     StorageRole: 10
 }
+
+
+def resolve_role_distribution(weights):
+    """Maps role names to weights onto the role classes of the default distribution."""
+    if weights is None:
+        return ROLE_DISTRIBUTION
+    role_classes = {role_class.__name__: role_class for role_class in ROLE_DISTRIBUTION}
+    unknown = set(weights) - set(role_classes)
+    if unknown:
+        raise ValueError(f"Unknown roles: {', '.join(sorted(unknown))}")
+    return {role_classes[name]: weight for name, weight in weights.items()}
@@ -1,7 +1,13 @@
+import math
 import random
 
 import numpy as np
 
+from app.simulation.virtual_clock import MINUTES_PER_DAY
+
+# Schedule entries further away than this many standard deviations of punctuality are treated as unreachable
+PUNCTUALITY_SIGMAS = 5
+
 
 class BaseRole:
     def __init__(
@@ -22,6 +28,24 @@ class BaseRole:
         self.next_move = self.get_next_move(0)
         self.overtime_end = None
 
+    @classmethod
+    def create_many(cls, building, count):
+        """
+        Creates count people of this role at once. They share the traits of one prototype and only their
+        first move is drawn individually, in a single vectorized draw.
+        """
+        if count == 0:
+            return []
+        prototype = cls(building)
+        traits = prototype.__dict__
+        roles = []
+        for next_move in np.random.normal(prototype.lingering, prototype.lingering, size=count).tolist():
+            role = cls.__new__(cls)
+            role.__dict__.update(traits)
+            role.next_move = next_move
+            roles.append(role)
+        return roles
+
     def get_next_move(self, current_time):
         return current_time + np.random.normal(self.lingering, self.lingering)
 
@@ -29,7 +53,14 @@ class BaseRole:
         """
         Determines the next floor request based on schedule and role traits.
         """
-        current_time_minutes = clock.get_virtual_minutes()
+        return self.get_request_at(clock.get_virtual_minutes_since_epoch())
+
+    def get_request_at(self, current_time_minutes):
+        """
+        Determines the floor request at the given virtual minute since the start of the simulation.
+        """
+        # next_move and overtime_end are kept on the unwrapped time line so they survive midnight
+        time_of_day = current_time_minutes % MINUTES_PER_DAY
 
         if current_time_minutes < self.next_move:
             return None
@@ -43,7 +74,7 @@ class BaseRole:
             adjusted_start = start_minutes + punctuality_offset
             adjusted_end = end_minutes + punctuality_offset
 
-            if not adjusted_start <= current_time_minutes < adjusted_end:
+            if not adjusted_start <= time_of_day < adjusted_end:
                 continue
 
             # Pick a new floor if lingering is low or no previous floor set
@@ -78,3 +109,51 @@ class BaseRole:
         old_floor = self.current_floor
         self.current_floor = random.choice(self.building.get_entrance_floors())
         return old_floor, self.current_floor,
+
+    def plan_trips(self, from_minute):
+        """
+        Lazily yields the trips of this role in time order as (minute, start, end) tuples.
+        Minutes in which the role cannot move are skipped instead of evaluated. If a whole day passes
+        without a trip, (minute, None, None) is yielded so the caller gets control back.
+        """
+        minute = from_minute
+        last_yield = from_minute
+        while True:
+            # nothing happens before next_move
+            minute = max(minute, math.ceil(self.next_move))
+            request = self.get_request_at(minute)
+            if request is not None:
+                yield minute, request[0], request[1]
+                last_yield = minute
+                minute += 1
+                continue
+
+            minute = max(minute + 1, self.get_next_wakeup(minute))
+            if minute - last_yield >= MINUTES_PER_DAY:
+                yield minute, None, None
+                last_yield = minute
+
+    def get_next_wakeup(self, current_time_minutes):
+        """
+        Returns the earliest virtual minute at which the role may move after not moving at current_time_minutes.
+        Schedule entries are considered reachable within PUNCTUALITY_SIGMAS standard deviations of punctuality.
+        """
+        time_of_day = current_time_minutes % MINUTES_PER_DAY
+        wait = MINUTES_PER_DAY
+        for start_hour, end_hour, _ in self.schedule:
+            spread = PUNCTUALITY_SIGMAS * self.punctuality_variance
+            earliest = max(0, start_hour * 60 + self.punctuality - spread)
+            latest = min(MINUTES_PER_DAY, end_hour * 60 + self.punctuality + spread)
+            if earliest >= latest:
+                continue
+            if earliest <= time_of_day < latest:
+                return current_time_minutes
+            if time_of_day < earliest:
+                wait = min(wait, earliest - time_of_day)
+            else:
+                wait = min(wait, MINUTES_PER_DAY - time_of_day + earliest)
+
+        # a running overtime ends with a move to the entrance
+        if self.overtime_end is not None and self.overtime_end > current_time_minutes:
+            wait = min(wait, self.overtime_end - current_time_minutes)
+        return current_time_minutes + math.floor(wait)
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from app.people.population import Population
+from app.simulation.seeding import seed_simulation
+
+
+class ShardClock:
+    """Stands in for the simulation clock inside a shard process, fixed to the minute the loop sent."""
+
+    def __init__(self):
+        self.minutes = 0
+
+    def get_virtual_minutes_since_epoch(self):
+        return self.minutes
+
+
+def run_shard(connection, seed, population_size, building, role_distribution, population_class):
+    """
+    Owns one shard of the population in a worker process. Answers every virtual minute it receives with the
+    ride requests of its people and the time it took to evaluate them, until it receives None.
+    """
+    seed_simulation(seed)
+    population = population_class(population_size, building, role_distribution)
+    connection.send(population.get_population())
+
+    clock = ShardClock()
+    while True:
+        minutes = connection.recv()
+        if minutes is None:
+            break
+        started = time.perf_counter()
+        clock.minutes = minutes
+        requests = population.get_requests(clock)
+        connection.send((requests, time.perf_counter() - started))
+    connection.close()
+
+
+class ShardedPopulation:
+    """
+    A population partitioned into shards that are evaluated in parallel by worker processes, one per shard.
+    Each tick the current virtual minute is sent to every shard and their requests are merged in shard order,
+    so a run is reproducible for a given seed and shard count. Runs with different shard counts draw from
+    different random streams and produce different, equally distributed, rides.
+    """
+
+    def __init__(self, population_size, building, role_distribution, shard_count=None, shard_class=Population):
+        """
+        :param shard_count: Number of worker processes, all cores if None.
+        :param shard_class: The population class evaluating the people of each shard.
+        """
+        self.population_size = population_size
+        self.building = building
+        self.role_distribution = role_distribution
+        shard_count = max(1, min(shard_count or os.cpu_count(), population_size))
+        # the shard seeds are drawn from the seeded main process, so the whole run depends on one seed only
+        seeds = np.random.randint(2 ** 32, size=shard_count, dtype=np.int64).tolist()
+        self.shard_sizes = [
+            population_size // shard_count + (shard < population_size % shard_count) for shard in range(shard_count)
+        ]
+
+        self.connections = []
+        self.processes = []
+        for seed, size in zip(seeds, self.shard_sizes):
+            connection, shard_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_shard,
+                args=(shard_connection, seed, size, building, role_distribution, shard_class),
+                daemon=True,
+            )
+            process.start()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+        # the shards build their people in parallel
+        self.population_summary = {role.__name__: 0 for role in role_distribution.keys()}
+        for connection in self.connections:
+            for role, count in connection.recv().items():
+                self.population_summary[role] += count
+        # people keep their roles, so the composition never changes
+        self.version = 0
+
+        # seconds each shard spent evaluating its people and seconds the loop waited for all of them
+        self.shard_seconds = [0.0] * shard_count
+        self.wall_seconds = 0.0
+        self.ticks = 0
+
+    def get_requests(self, clock):
+        """Collects the ride requests of all shards as (start, end, person_id, role) rows, ordered by shard."""
+        started = time.perf_counter()
+        minutes = clock.get_virtual_minutes_since_epoch()
+        for connection in self.connections:
+            connection.send(minutes)
+
+        requests = []
+        for shard, connection in enumerate(self.connections):
+            shard_requests, seconds = connection.recv()
+            requests.extend(shard_requests)
+            self.shard_seconds[shard] += seconds
+        self.wall_seconds += time.perf_counter() - started
+        self.ticks += 1
+        return requests
+
+    def get_version(self):
+        return self.version
+
+    def get_population(self):
+        return dict(self.population_summary)
+
+    def get_shard_timings(self):
+        """
+        Returns how the evaluation time is spread over the shards. The sum of the shard seconds divided by the
+        wall seconds is the speedup over evaluating all shards one after the other.
+        """
+        return {
+            "ticks": self.ticks,
+            "wall_seconds": self.wall_seconds,
+            "shards": [
+                {"shard": shard, "people": size, "seconds": seconds}
+                for shard, (size, seconds) in enumerate(zip(self.shard_sizes, self.shard_seconds))
+            ],
+        }
+
+    def close(self):
+        """Stops the shard processes."""
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
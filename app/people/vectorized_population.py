@@ -0,0 +1,147 @@
+import numpy as np
+
+from app.people.population import Population
+from app.simulation.virtual_clock import MINUTES_PER_DAY
+
+
+class ScheduleEntry:
+    """A schedule interval of a role together with a lookup table of the floors it may send people to."""
+
+    def __init__(self, building, start_hour, end_hour, categories):
+        self.start_minutes = start_hour * 60
+        self.end_minutes = end_hour * 60
+        floors = [building.get_floors_for_category(category) for category in categories]
+        self.floor_counts = np.array([len(category_floors) for category_floors in floors])
+        # one row per category, padded to the largest category
+        self.floor_table = np.zeros((len(floors), max(1, self.floor_counts.max())), dtype=np.int64)
+        for row, category_floors in enumerate(floors):
+            self.floor_table[row, :len(category_floors)] = category_floors
+
+    def pick_floors(self, count):
+        """Picks a random category and then a random floor of that category for each of count people."""
+        categories = np.random.randint(len(self.floor_counts), size=count)
+        counts = self.floor_counts[categories]
+        picks = (np.random.random(count) * counts).astype(np.int64)
+        floors = self.floor_table[categories, np.minimum(picks, np.maximum(counts - 1, 0))]
+        # categories without floors in this building never produce a move
+        return floors, counts > 0
+
+
+class RoleGroup:
+    """The state of all people sharing one role class, stored column-wise."""
+
+    def __init__(self, building, role_index, people):
+        roles = [person.role for person in people]
+        self.role_index = role_index
+        self.schedule = [ScheduleEntry(building, *entry) for entry in roles[0].schedule]
+        self.entrance_floors = np.array(building.get_entrance_floors())
+
+        self.punctuality = np.array([role.punctuality for role in roles], dtype=float)
+        self.punctuality_variance = np.array([role.punctuality_variance for role in roles], dtype=float)
+        self.lingering = np.array([role.lingering for role in roles], dtype=float)
+        self.overtime = np.array([role.overtime for role in roles], dtype=float)
+        self.overtime_variance = np.array([role.overtime_variance for role in roles], dtype=float)
+        self.current_floor = np.array([role.current_floor for role in roles], dtype=np.int64)
+        self.next_move = np.array([role.next_move for role in roles], dtype=float)
+        # NaN marks people without a running overtime
+        self.overtime_end = np.full(len(roles), np.nan)
+
+    def step(self, current_time_minutes):
+        """
+        Evaluates the role behaviour of every due person of this group at once.
+        :return: Arrays of group-local person indices, start floors and end floors.
+        """
+        time_of_day = current_time_minutes % MINUTES_PER_DAY
+        pending = np.flatnonzero(current_time_minutes >= self.next_move)
+        movers, starts, ends = [], [], []
+
+        for entry in self.schedule:
+            if not pending.size:
+                break
+            # Gaussian punctuality drawn per person and entry, truncated like int() in BaseRole
+            offsets = np.random.normal(self.punctuality[pending], self.punctuality_variance[pending]).astype(np.int64)
+            in_interval = (entry.start_minutes + offsets <= time_of_day) & (time_of_day < entry.end_minutes + offsets)
+            matched = pending[in_interval]
+            pending = pending[~in_interval]
+            if not matched.size:
+                continue
+
+            floors, valid = entry.pick_floors(matched.size)
+            # people who drew the floor they are already on stay where they are
+            moving = valid & (floors != self.current_floor[matched])
+            self.move(matched[moving], floors[moving], current_time_minutes, movers, starts, ends)
+
+        if pending.size:
+            # Use Gaussian distribution for overtime on everybody outside of their schedule
+            no_overtime = pending[np.isnan(self.overtime_end[pending])]
+            offsets = np.random.normal(self.overtime[no_overtime], self.overtime_variance[no_overtime]).astype(np.int64)
+            self.overtime_end[no_overtime] = current_time_minutes + offsets
+
+            leaving = pending[current_time_minutes >= self.overtime_end[pending]]
+            self.overtime_end[leaving] = np.nan
+            leaving = leaving[self.current_floor[leaving] != 0]
+            if leaving.size:
+                floors = self.entrance_floors[np.random.randint(self.entrance_floors.size, size=leaving.size)]
+                self.move(leaving, floors, current_time_minutes, movers, starts, ends)
+
+        if not movers:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(movers), np.concatenate(starts), np.concatenate(ends)
+
+    def move(self, people, floors, current_time_minutes, movers, starts, ends):
+        """Moves the given people to their new floors and draws the time of their next move."""
+        if not people.size:
+            return
+        movers.append(people)
+        starts.append(self.current_floor[people].copy())
+        ends.append(floors)
+        self.current_floor[people] = floors
+        self.next_move[people] = current_time_minutes + np.random.normal(self.lingering[people], self.lingering[people])
+
+
+class VectorizedPopulation(Population):
+    """
+    A population evaluating all people of a role with a handful of array operations per tick.
+    The role objects only seed the initial state; afterwards the arrays are the source of truth.
+    """
+
+    def __init__(self, population_size, building, role_distribution):
+        super().__init__(population_size, building, role_distribution)
+        self.role_names = [role_class.__name__ for role_class in self.role_distribution.keys()]
+        self.groups = []
+        self.group_people = []
+        for role_index in range(len(self.role_distribution)):
+            people = np.flatnonzero(self.role_assignments == role_index)
+            if not people.size:
+                continue
+            self.groups.append(RoleGroup(building, role_index, [self.population[index] for index in people.tolist()]))
+            self.group_people.append(people.astype(np.int64))
+
+    def step(self, clock):
+        """
+        Computes the ride requests due in this tick.
+        :return: Arrays of start floors, end floors, person indices and role indices ordered by person index.
+        """
+        current_time_minutes = clock.get_virtual_minutes_since_epoch()
+        starts, ends, people, roles = [], [], [], []
+        for group, group_people in zip(self.groups, self.group_people):
+            movers, group_starts, group_ends = group.step(current_time_minutes)
+            starts.append(group_starts)
+            ends.append(group_ends)
+            people.append(group_people[movers])
+            roles.append(np.full(movers.size, group.role_index, dtype=np.int64))
+
+        if not starts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        starts, ends, people, roles = (np.concatenate(column) for column in (starts, ends, people, roles))
+        order = np.argsort(people, kind="stable")
+        return starts[order], ends[order], people[order], roles[order]
+
+    def get_requests(self, clock):
+        starts, ends, people, roles = self.step(clock)
+        return [
+            (start, end, self.population[person].get_employee_id(), self.role_names[role])
+            for start, end, person, role in zip(starts.tolist(), ends.tolist(), people.tolist(), roles.tolist())
+        ]
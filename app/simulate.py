@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+import time
+
+from app.building.building_config import load_building_config
+from app.simulation.engine import POPULATION_CLASSES, SCHEDULER_STRATEGIES, create_engine
+from app.simulation.trace import TraceRecorder, TraceReplayer
+from app.statistics.ride_store import RideStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs the elevator simulation headless as fast as possible.")
+    parser.add_argument("--days", type=float, default=1, help="Number of virtual days to simulate.")
+    parser.add_argument("--building", help="JSON or TOML file describing the floors and the population. "
+                                           "The flags below override the settings it contains.")
+    parser.add_argument("--population", type=int, help="Number of simulated people. Defaults to 100.")
+    parser.add_argument("--max-load", type=int, help="Maximum load of the cabin in kg. Defaults to 1200.")
+    parser.add_argument("--cars", type=int, help="Number of elevator cars in the group. Defaults to 1.")
+    parser.add_argument("--scale", type=float, default=120, help="Virtual seconds per simulated real second.")
+    parser.add_argument("--population-mode", choices=POPULATION_CLASSES.keys(), default="default",
+                        help="How the population is evaluated each tick.")
+    parser.add_argument("--shards", type=int,
+                        help="Splits the population into this many shards evaluated by worker processes.")
+    parser.add_argument("--scheduler", choices=SCHEDULER_STRATEGIES.keys(), default="scan",
+                        help="Scheduling strategy of the elevator cars.")
+    parser.add_argument("--output", help="File the ride log is written to as newline delimited JSON.")
+    parser.add_argument("--store", help="Directory of a memory-mapped ride store every ride is appended to.")
+    parser.add_argument("--seed", type=int, help="Seed making the population and its ride requests reproducible.")
+    parser.add_argument("--record", help="File every ride request is recorded to as a binary trace.")
+    parser.add_argument("--replay", help="Trace whose ride requests are replayed instead of simulating people. "
+                                         "Runs until the trace is exhausted and every passenger is delivered.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    building_options = {"population_size": 100, "max_load": 1200, "car_count": 1}
+    if args.building:
+        building_config = load_building_config(args.building)
+        building_options.update({name: value for name, value in building_config._asdict().items() if value is not None})
+    for name, value in (("population_size", args.population), ("max_load", args.max_load), ("car_count", args.cars)):
+        if value is not None:
+            building_options[name] = value
+
+    replayer = TraceReplayer(args.replay) if args.replay else None
+    recorder = TraceRecorder(args.record) if args.record else None
+    engine = create_engine(**building_options, scale=args.scale,
+                           ride_store=RideStore(args.store) if args.store else None,
+                           population_class=POPULATION_CLASSES[args.population_mode],
+                           seed=args.seed, population=replayer, recorder=recorder,
+                           scheduler_class=SCHEDULER_STRATEGIES[args.scheduler], shard_count=args.shards)
+
+    started = time.perf_counter()
+    if replayer is not None:
+        group = engine.loop.group
+        engine.run_while(lambda: not replayer.is_exhausted() or group.has_pending_requests())
+    else:
+        engine.run_days(args.days)
+    elapsed = time.perf_counter() - started
+    if recorder is not None:
+        recorder.close()
+    if args.shards and replayer is None:
+        engine.loop.population.close()
+
+    if args.output:
+        with open(args.output, "w") as output:
+            for ride in engine.loop.logger.get():
+                output.write(json.dumps(ride, default=str) + "\n")
+
+    json.dump(engine.loop.statistics.get(), sys.stdout, indent=2)
+    print()
+    if replayer is not None:
+        print(f"Replayed {replayer.replayed} ride(s) in {elapsed:.2f} s.", file=sys.stderr)
+    else:
+        print(f"Simulated {args.days} virtual day(s) in {elapsed:.2f} s.", file=sys.stderr)
+    if args.shards and replayer is None:
+        print_shard_timings(engine.loop.population.get_shard_timings())
+
+
+def print_shard_timings(timings):
+    """Prints the time each shard spent evaluating its people, to see how the population scales across cores."""
+    busy = sum(shard["seconds"] for shard in timings["shards"])
+    print(f"Population evaluated in {timings['wall_seconds']:.2f} s over {timings['ticks']} ticks, "
+          f"{busy:.2f} s of shard time ({busy / max(timings['wall_seconds'], 1e-9):.1f}x parallel).", file=sys.stderr)
+    for shard in timings["shards"]:
+        print(f"  shard {shard['shard']}: {shard['people']} people, {shard['seconds']:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
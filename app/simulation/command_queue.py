@@ -0,0 +1,76 @@
+import heapq
+import itertools
+import time
+from collections import deque
+
+# Weight of the latest drain in the moving average of the ingress rate
+RATE_SMOOTHING = 0.2
+
+
+class CommandQueue:
+    """
+    Multi-producer queue of ride commands between request handlers and the simulation loop.
+    Producers only append to a deque, which is atomic in CPython, so handlers never take a lock and
+    never touch simulation state. The loop drains the queue at the start of every tick.
+    """
+
+    def __init__(self):
+        self.commands = deque()
+        # heap of (due time, order, command) of commands scheduled for a later virtual time
+        self.delayed = []
+        self.order = itertools.count()
+        # counters below are only written by the draining loop thread
+        self.drained = 0
+        self.max_depth = 0
+        self.rate = 0.0
+        self.last_drain = None
+
+    def put(self, start, end, person_id=None, role=None, due=None):
+        """
+        Enqueues a ride request. Safe to call from any thread.
+        :param due: Virtual time in elapsed virtual seconds before which the ride is held back. None applies it at once.
+        """
+        self.commands.append((start, end, person_id, role, due))
+
+    def put_many(self, commands):
+        """Enqueues (start, end, person_id, role, due) rows at once so they are drained in the same tick."""
+        self.commands.extend(commands)
+
+    def drain(self, current_time=None):
+        """
+        Removes and returns all commands enqueued so far that are due as (start, end, person_id, role) rows.
+        :param current_time: The current virtual time in elapsed virtual seconds. Commands due later are held back.
+        """
+        # every drain empties the queue, so its depth is also the number of commands enqueued since the last one
+        depth = len(self.commands)
+        self.max_depth = max(self.max_depth, depth + len(self.delayed))
+        commands = []
+        for _ in range(depth):
+            start, end, person_id, role, due = self.commands.popleft()
+            if due is not None and (current_time is None or due > current_time):
+                heapq.heappush(self.delayed, (due, next(self.order), (start, end, person_id, role)))
+                continue
+            commands.append((start, end, person_id, role))
+        while self.delayed and current_time is not None and self.delayed[0][0] <= current_time:
+            commands.append(heapq.heappop(self.delayed)[2])
+
+        now = time.monotonic()
+        if self.last_drain is not None and now > self.last_drain:
+            current_rate = depth / (now - self.last_drain)
+            self.rate = RATE_SMOOTHING * current_rate + (1 - RATE_SMOOTHING) * self.rate
+        self.last_drain = now
+        # only the commands applied in this tick count, deferred ones are counted once they are due
+        self.drained += len(commands)
+        return commands
+
+    def get_depth(self):
+        return len(self.commands)
+
+    def get_state(self):
+        return {
+            "depth": len(self.commands),
+            "delayed": len(self.delayed),
+            "max_depth": self.max_depth,
+            "drained": self.drained,
+            "rate": self.rate,
+        }
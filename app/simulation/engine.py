@@ -0,0 +1,93 @@
+from app.building.building import Building
+from app.building.floordefinition import FLOOR_DEFINITION
+from app.elevator.elevator_group import ElevatorGroup
+from app.elevator.scheduling.elevator_scheduler import Scheduler
+from app.elevator.scheduling.nearest_request_scheduler import NearestRequestScheduler
+from app.people.planned_population import PlannedPopulation
+from app.people.population import Population
+from app.people.roledistribution import ROLE_DISTRIBUTION
+from app.people.sharded_population import ShardedPopulation
+from app.people.vectorized_population import VectorizedPopulation
+from app.simulation.loop import Loop
+from app.simulation.seeding import seed_simulation
+from app.simulation.stepped_clock import SteppedClock
+from app.simulation.virtual_clock import SECONDS_PER_DAY
+from app.statistics.ride_log import RideLog
+from app.statistics.statistics import Statistics
+
+# Ways of evaluating the population each tick, selectable by name
+POPULATION_CLASSES = {
+    "default": Population,
+    "vectorized": VectorizedPopulation,
+    "planned": PlannedPopulation,
+}
+
+# Scheduling strategies of the elevator cars, selectable by name
+SCHEDULER_STRATEGIES = {
+    "scan": Scheduler,
+    "nearest": NearestRequestScheduler,
+}
+
+
+class Engine:
+    """Runs a simulation loop headless, stepping a virtual clock as fast as the CPU allows."""
+
+    def __init__(self, loop, clock):
+        """
+        :param loop: The simulation loop to drive. It must read its time from the given clock.
+        :param clock: A SteppedClock advanced by the real-world duration each tick would have taken.
+        """
+        self.loop = loop
+        self.clock = clock
+
+    def run_for(self, virtual_seconds):
+        """Runs ticks until the given amount of virtual time has passed."""
+        end = self.clock.get_elapsed_virtual_seconds() + virtual_seconds
+        while self.clock.get_elapsed_virtual_seconds() < end:
+            self.loop.tick()
+            self.clock.advance(self.loop.get_tick_duration())
+
+    def run_while(self, condition):
+        """Runs ticks as long as the given callable returns True."""
+        while condition():
+            self.loop.tick()
+            self.clock.advance(self.loop.get_tick_duration())
+
+    def run_days(self, days):
+        """Runs the simulation for the given number of virtual days."""
+        self.run_for(days * SECONDS_PER_DAY)
+
+
+def create_engine(
+        population_size=100, max_load=1200, scale=120, car_count=1,
+        iteration_interval=0.125, stop_time=0.25,
+        floor_definition=FLOOR_DEFINITION, role_distribution=ROLE_DISTRIBUTION,
+        log_size=None, population_class=Population, ride_store=None,
+        seed=None, population=None, recorder=None, scheduler_class=Scheduler, shard_count=None
+):
+    """
+    Wires up a complete headless simulation and returns the engine driving it.
+    :param seed: Seeds all randomness before the population is created, making the run reproducible.
+    :param population: A source of ride requests such as a TraceReplayer used instead of a new population.
+    :param recorder: An optional TraceRecorder writing every submitted ride request.
+    :param scheduler_class: The SchedulerStrategy driving each car.
+    :param shard_count: Splits the population into this many shards of population_class evaluated by
+                        worker processes. The caller closes the population when the run is over.
+    """
+    if seed is not None:
+        seed_simulation(seed)
+    building = Building(floor_definition)
+    if population is None and shard_count:
+        population = ShardedPopulation(population_size, building, role_distribution, shard_count, population_class)
+    elif population is None:
+        population = population_class(population_size, building, role_distribution)
+    clock = SteppedClock(scale=scale)
+    group = ElevatorGroup(building.number_of_floors, max_load, car_count, clock=clock,
+                          scheduler_class=scheduler_class)
+    statistics = Statistics(clock, building.number_of_floors, car_count)
+    ride_log = RideLog(clock, size=log_size, store=ride_store)
+    # nobody reads snapshots of a headless run
+    loop = Loop(group, population, clock, statistics, ride_log,
+                iteration_interval=iteration_interval, stop_time=stop_time, recorder=recorder,
+                publish_snapshots=False)
+    return Engine(loop, clock)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+
+class FrameBroadcaster:
+    """Holds the latest rendered frame so that any number of subscribers can share a single render per tick."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.frame = None
+        # sequence number of the latest frame, subscribers wait for it to grow
+        self.sequence = 0
+        self.subscriber_count = 0
+        # futures of asyncio subscribers waiting for the next frame
+        self.waiters = []
+
+    def publish(self, frame):
+        """Replaces the latest frame and wakes up every waiting subscriber."""
+        with self.condition:
+            self.frame = frame
+            self.sequence += 1
+            self.condition.notify_all()
+            waiters, self.waiters = self.waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(wake_up, waiter)
+
+    def add_subscriber(self):
+        """Registers a subscriber and returns the sequence number it should wait to be exceeded."""
+        with self.condition:
+            self.subscriber_count += 1
+            return self.sequence
+
+    def remove_subscriber(self):
+        with self.condition:
+            self.subscriber_count -= 1
+
+    def has_subscribers(self):
+        return self.subscriber_count > 0
+
+    def get_subscriber_count(self):
+        return self.subscriber_count
+
+    def wait_for_frame(self, last_sequence, timeout=None):
+        """
+        Blocks until a frame newer than last_sequence was published.
+        :return: The sequence number and the frame, or the unchanged last_sequence and None on timeout.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.sequence > last_sequence, timeout):
+                return last_sequence, None
+            return self.sequence, self.frame
+
+    async def wait_for_frame_async(self, last_sequence):
+        """Waits without blocking the event loop until a frame newer than last_sequence was published."""
+        while True:
+            with self.condition:
+                if self.sequence > last_sequence:
+                    return self.sequence, self.frame
+                waiter = asyncio.get_running_loop().create_future()
+                self.waiters.append(waiter)
+            await waiter
+
+    def subscribe(self):
+        """Yields every frame published after subscribing. Frames published while the consumer is busy are skipped."""
+        sequence = self.add_subscriber()
+        try:
+            while True:
+                sequence, frame = self.wait_for_frame(sequence)
+                yield frame
+        finally:
+            self.remove_subscriber()
+
+
+def wake_up(waiter):
+    # waiters of cancelled subscribers are already done
+    if not waiter.done():
+        waiter.set_result(None)
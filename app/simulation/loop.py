@@ -1,54 +1,151 @@
+import asyncio
 import time
 
 from app.elevator.scheduling.scheduler_moves import Moves
+from app.simulation.command_queue import CommandQueue
+from app.simulation.frame_broadcaster import FrameBroadcaster
+from app.simulation.snapshot import Snapshot
+from app.simulation.tick_metrics import TickMetrics
 
 
 class Loop:
-    def __init__(self, scheduler, elevator, population, clock, statistics, logger, iteration_interval=0.5, stop_time=1):
-        self.scheduler = scheduler
-        self.elevator = elevator
+    def __init__(self, group, population, clock, statistics, logger, iteration_interval=0.5, stop_time=1,
+                 recorder=None, publish_snapshots=True):
+        self.group = group
         self.population = population
         self.clock = clock
         self.statistics = statistics
         self.logger = logger
         self.iteration_interval = iteration_interval
         self.stop_time = stop_time
+        # optional TraceRecorder writing every submitted ride request
+        self.recorder = recorder
+        self.broadcaster = FrameBroadcaster()
+        # ride requests from other threads, applied at the start of each tick
+        self.commands = CommandQueue()
+        self.metrics = TickMetrics()
+        # number of completed ticks and the Snapshot of the last one, if publishing is enabled
+        self.tick_count = 0
+        self.publish_snapshots = publish_snapshots
+        self.snapshot = None
 
     def run(self):
         while True:
-            for person in self.population.get_people():
-                request = person.get_next_request(self.clock)
-                if request is None:
-                    continue
-                start, end = request
-                self.scheduler.handle_request(start, end)
-                self.statistics.track_ride(start, end)
-                self.logger.log_ride(start, end, person.get_employee_id(), person.role.__class__.__name__)
-
-                # Process elevator moves
-            move = self.scheduler.get_next_move()
-            match move:
-                case Moves.UP:
-                    self.elevator.close_doors()
-                    self.elevator.move_up()
-                case Moves.STOP:
-                    self.elevator.open_doors()
-                case Moves.DOWN:
-                    self.elevator.close_doors()
-                    self.elevator.move_down()
-                case Moves.STAY:
-                    self.elevator.close_doors()
-
-            if self.elevator.get_door_state():
-                time.sleep(self.stop_time)
-            time.sleep(self.iteration_interval)
+            self.tick()
+            duration = self.get_tick_duration()
+            started = time.perf_counter()
+            time.sleep(duration)
+            self.metrics.observe_sleep(duration, time.perf_counter() - started)
 
-    def generate_ascii_art(self):
+    async def run_async(self):
+        """Runs the simulation as a task on an asyncio event loop instead of a thread."""
         while True:
-            elevator_status = str(self.elevator)
-            scheduler_status = str(self.scheduler)
-            current_time = f"Current Time: {str(self.clock)}"
-            ascii_output = f"{current_time}\n\n{elevator_status}\n{scheduler_status}"
-            formatted_data = "\n".join([f"data: {line}" for line in ascii_output.split("\n")])
-            yield f"{formatted_data}\n\n"
-            time.sleep(self.iteration_interval)
+            self.tick()
+            duration = self.get_tick_duration()
+            started = time.perf_counter()
+            await asyncio.sleep(duration)
+            self.metrics.observe_sleep(duration, time.perf_counter() - started)
+
+    def tick(self):
+        """Runs a single simulation step: collects ride requests and moves the elevator once."""
+        # every reader sees the same virtual time for the whole tick
+        self.clock.tick()
+        if self.clock.is_paused():
+            return
+        metrics = self.metrics
+        tick_started = phase_started = time.perf_counter()
+        for start, end, person_id, role in self.commands.drain(self.clock.get_elapsed_virtual_seconds()):
+            self.submit(start, end, person_id, role)
+        now = time.perf_counter()
+        metrics.observe_phase("commands", now - phase_started)
+
+        phase_started = now
+        for start, end, person_id, role in self.population.get_requests(self.clock):
+            self.submit(start, end, person_id, role)
+        now = time.perf_counter()
+        metrics.observe_phase("population", now - phase_started)
+
+        # Process elevator moves
+        scheduling = actuation = 0.0
+        for car in self.group.get_cars():
+            phase_started = now
+            move = car.scheduler.get_next_move()
+            now = time.perf_counter()
+            scheduling += now - phase_started
+            phase_started = now
+            self.actuate(car.elevator, move)
+            now = time.perf_counter()
+            actuation += now - phase_started
+        metrics.observe_phase("scheduling", scheduling)
+        metrics.observe_phase("actuation", actuation)
+
+        phase_started = now
+        trips = self.group.pop_completed_trips()
+        for passenger in trips:
+            self.statistics.track_journey(passenger.origin, passenger.destination, passenger.role,
+                                          passenger.get_wait_time(), passenger.get_journey_time())
+        metrics.rides_served += len(trips)
+        now = time.perf_counter()
+        metrics.observe_phase("trips", now - phase_started)
+
+        phase_started = now
+        self.statistics.track_sample(self.group.get_waiting_counts(), self.group.get_loads())
+        now = time.perf_counter()
+        metrics.observe_phase("sampling", now - phase_started)
+
+        self.tick_count += 1
+        if self.publish_snapshots:
+            phase_started = now
+            # a single reference assignment, readers see either the previous or the new snapshot
+            self.snapshot = Snapshot.capture(self.tick_count, self.clock, self.group, self.statistics, self.snapshot)
+            now = time.perf_counter()
+            metrics.observe_phase("snapshot", now - phase_started)
+
+        # render once per tick, no matter how many clients are watching
+        if self.broadcaster.has_subscribers():
+            phase_started = now
+            self.broadcaster.publish(self.render_frame())
+            now = time.perf_counter()
+            metrics.observe_phase("render", now - phase_started)
+        metrics.observe_tick(now - tick_started)
+
+    def submit(self, start, end, person_id=None, role=None):
+        """Applies a ride request to the elevators, the statistics and the ride log. Only called on the loop's thread."""
+        self.group.handle_request(start, end, role, person_id)
+        self.metrics.rides_requested += 1
+        self.statistics.track_ride(start, end)
+        self.logger.log_ride(start, end, person_id, role)
+        if self.recorder is not None:
+            self.recorder.record(self.clock.get_elapsed_virtual_seconds(), start, end, person_id, role)
+
+    @staticmethod
+    def actuate(elevator, move):
+        """Carries out a move suggested by a scheduler on its elevator."""
+        match move:
+            case Moves.UP:
+                elevator.close_doors()
+                elevator.move_up()
+            case Moves.STOP:
+                elevator.open_doors()
+            case Moves.DOWN:
+                elevator.close_doors()
+                elevator.move_down()
+            case Moves.STAY:
+                elevator.close_doors()
+
+    def get_tick_duration(self):
+        """Returns the real-world seconds the last tick occupies, including the stop time of open doors."""
+        if self.group.any_doors_open():
+            return self.iteration_interval + self.stop_time
+        return self.iteration_interval
+
+    def render_frame(self):
+        """Renders the current state as a server-sent event."""
+        group_status = str(self.group)
+        current_time = f"Current Time: {str(self.clock)}"
+        ascii_output = f"{current_time}\n\n{group_status}"
+        formatted_data = "\n".join([f"data: {line}" for line in ascii_output.split("\n")])
+        return f"{formatted_data}\n\n"
+
+    def generate_ascii_art(self):
+        yield from self.broadcaster.subscribe()
@@ -0,0 +1,73 @@
+import time
+
+from app.elevator.scheduling.scheduler_moves import Moves
+from app.simulation.engine import create_engine
+from app.simulation.trace import TraceReplayer
+
+
+class MeasuredStrategy:
+    """Wraps the scheduler of a car, counting the floors it moves and the CPU time its decisions take."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.decisions = 0
+        self.moves = 0
+        self.decision_seconds = 0.0
+
+    def get_next_move(self):
+        started = time.process_time()
+        move = self.scheduler.get_next_move()
+        self.decision_seconds += time.process_time() - started
+        self.decisions += 1
+        if move in (Moves.UP, Moves.DOWN):
+            self.moves += 1
+        return move
+
+    def __getattr__(self, name):
+        # everything else, e.g. what the dispatcher inspects, is answered by the wrapped scheduler
+        return getattr(self.scheduler, name)
+
+
+def compare_strategies(trace_path, strategies, **engine_options):
+    """
+    Replays the same ride trace once per scheduling strategy and measures how well each serves it.
+    :param trace_path: A trace written by a TraceRecorder.
+    :param strategies: Maps names to SchedulerStrategy classes.
+    :param engine_options: Further arguments of create_engine such as car_count or max_load.
+    :return: One result row per strategy.
+    """
+    rows = []
+    for name, scheduler_class in strategies.items():
+        replayer = TraceReplayer(trace_path)
+        engine = create_engine(population=replayer, scheduler_class=scheduler_class, log_size=0, **engine_options)
+        group = engine.loop.group
+        measured = [MeasuredStrategy(car.scheduler) for car in group.get_cars()]
+        for car, strategy in zip(group.get_cars(), measured):
+            car.scheduler = strategy
+
+        started = time.perf_counter()
+        engine.run_while(lambda: not replayer.is_exhausted() or group.has_pending_requests())
+        elapsed = time.perf_counter() - started
+
+        statistics = engine.loop.statistics.get()
+        wait_time = statistics["wait_time"]
+        journey_time = statistics["journey_time"]
+        # every car decides once per tick
+        ticks = measured[0].decisions
+        moves = sum(strategy.moves for strategy in measured)
+        decision_seconds = sum(strategy.decision_seconds for strategy in measured)
+        delivered = wait_time["count"]
+        rows.append({
+            "scheduler": name,
+            "rides": replayer.replayed,
+            "delivered": delivered,
+            "moves": moves,
+            "moves_per_passenger": moves / delivered if delivered else 0,
+            "average_wait": wait_time["mean"],
+            "wait_p90": wait_time["p90"],
+            "average_journey": journey_time["mean"],
+            "virtual_seconds": engine.clock.get_elapsed_virtual_seconds(),
+            "decision_us_per_tick": decision_seconds / ticks * 1e6 if ticks else 0,
+            "elapsed_seconds": elapsed,
+        })
+    return rows
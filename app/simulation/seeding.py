@@ -0,0 +1,13 @@
+import random
+
+import numpy as np
+
+
+def seed_simulation(seed):
+    """
+    Seeds every source of randomness the simulation draws from, so runs with the same seed produce the
+    same population, the same person ids and the same ride requests.
+    """
+    random.seed(seed)
+    # NumPy only accepts 32 bit seeds
+    np.random.seed(seed % 2 ** 32)
@@ -1,33 +1,84 @@
+import argparse
+import json
+import math
 import threading
 import uuid
 from hashlib import sha256
 from flask import Flask, jsonify, request, Response, render_template_string
 from app.building.building import Building
+from app.building.building_config import load_building_config
 from app.building.floordefinition import FLOOR_DEFINITION
-from app.elevator.elevator import Elevator
-from app.elevator.scheduling.elevator_scheduler import Scheduler
+from app.elevator.elevator_group import ElevatorGroup
 from app.statistics.ride_log import RideLog
-from app.statistics.statistics import Statistics
+from app.statistics.ride_store import RideStore
+from app.statistics.rolling_window import WINDOWS
+from app.statistics.statistics import TOP_PAIRS, Statistics
 from app.people.population import Population
+from app.people.sharded_population import ShardedPopulation
 from app.people.roledistribution import ROLE_DISTRIBUTION
 from app.simulation.loop import Loop
+from app.simulation.tick_metrics import render_metrics
 from app.simulation.virtual_clock import VirtualClock
 
 # Constants
 POPULATION_SIZE = 100
 MAX_LOAD = 1200
+CAR_COUNT = 1
+# JSON or TOML file describing the building and its population, None uses the built-in building
+BUILDING_CONFIG = None
+# Number of worker processes the population is split across, None evaluates it in the simulation thread
+POPULATION_SHARDS = None
+# Directory of the memory-mapped ride history, None keeps only the latest rides in memory
+RIDE_STORE_DIRECTORY = None
+# Maximum number of rides returned by a filtered ride log query without an explicit limit
+LOG_QUERY_LIMIT = 1000
+# Maximum number of rides accepted by a single bulk ride request
+BULK_RIDE_LIMIT = 100000
+# Distinguishes the ETags of this process from those of earlier runs, whose versions started at 0 as well
+ETAG_PREFIX = uuid.uuid4().hex[:8]
 
 # Initialize Flask app
 app = Flask(__name__)
 
+if BUILDING_CONFIG:
+    building_config = load_building_config(BUILDING_CONFIG)
+    FLOOR_DEFINITION = building_config.floor_definition
+    ROLE_DISTRIBUTION = building_config.role_distribution
+    POPULATION_SIZE = building_config.population_size or POPULATION_SIZE
+    MAX_LOAD = building_config.max_load or MAX_LOAD
+    CAR_COUNT = building_config.car_count or CAR_COUNT
+
 building = Building(FLOOR_DEFINITION)
-population = Population(POPULATION_SIZE, building, ROLE_DISTRIBUTION)
-elevator = Elevator(building.number_of_floors, MAX_LOAD)
-scheduler = Scheduler(elevator)
+if POPULATION_SHARDS:
+    population = ShardedPopulation(POPULATION_SIZE, building, ROLE_DISTRIBUTION, POPULATION_SHARDS)
+else:
+    population = Population(POPULATION_SIZE, building, ROLE_DISTRIBUTION)
 clock = VirtualClock(scale=120)
-statistics = Statistics(clock)
-ride_log = RideLog(clock)
-loop = Loop(scheduler, elevator, population, clock, statistics, ride_log, iteration_interval=0.125, stop_time=0.25)
+group = ElevatorGroup(building.number_of_floors, MAX_LOAD, CAR_COUNT, clock=clock)
+statistics = Statistics(clock, building.number_of_floors, CAR_COUNT)
+ride_log = RideLog(clock, store=RideStore(RIDE_STORE_DIRECTORY) if RIDE_STORE_DIRECTORY else None)
+loop = Loop(group, population, clock, statistics, ride_log, iteration_interval=0.125, stop_time=0.25)
+# endpoint key -> (state version, serialized JSON body)
+json_cache = {}
+
+
+def versioned_json(key, version, build):
+    """
+    Responds with the JSON of build(), serialized once per version of the state it reads. Clients sending
+    the ETag of the current version in If-None-Match get an empty 304 response instead.
+    """
+    etag = f"{ETAG_PREFIX}-{key}-{version}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    cached = json_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, app.json.response(build()).get_data())
+        json_cache[key] = cached
+    response = Response(cached[1], mimetype='application/json')
+    response.set_etag(etag)
+    return response
 
 
 @app.route('/elevator/stream', methods=['GET'])
@@ -75,34 +126,128 @@ def get_current_time():
     return jsonify(str(clock))
 
 
+@app.route('/elevator/clock', methods=['GET', 'POST'])
+def control_clock():
+    """ Returns the state of the virtual clock. A POST pauses, resumes or rescales it without the time jumping."""
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        scale = body.get('scale')
+        paused = body.get('paused')
+        # get_json accepts NaN and Infinity, neither is a usable scale
+        if scale is not None and (isinstance(scale, bool) or not isinstance(scale, (int, float))
+                                  or not (math.isfinite(scale) and scale > 0)):
+            return jsonify({'error': 'The scale has to be a positive finite number'}), 400
+        if paused is not None and not isinstance(paused, bool):
+            return jsonify({'error': 'paused has to be true or false'}), 400
+        if scale is not None:
+            clock.set_scale(scale)
+        if paused is True:
+            clock.pause()
+        elif paused is False:
+            clock.resume()
+    return jsonify(clock.get_state())
+
+
 @app.route('/elevator/cabin_state', methods=['GET'])
 def get_elevator_state():
-    """ Returns the current state of the elevator."""
-    return jsonify(elevator.get_state())
+    """ Returns the current state of all elevator cars or of the car selected by index."""
+    car = request.args.get('car', type=int)
+    if car is None:
+        return versioned_json('cabin_state', group.get_cabin_version(), group.get_cabin_states)
+    if not 0 <= car < group.get_car_count():
+        return jsonify({'error': 'Invalid car'}), 400
+    elevator = group.get_car(car).elevator
+    return versioned_json(f'cabin_state-{car}', elevator.get_version(), elevator.get_state)
 
 
 @app.route('/elevator/scheduler_state', methods=['GET'])
 def get_scheduler_state():
-    """ Returns the current state of the scheduler."""
-    return jsonify(scheduler.get_state())
+    """ Returns the current state of the schedulers of all cars or of the car selected by index."""
+    car = request.args.get('car', type=int)
+    if car is None:
+        return versioned_json('scheduler_state', group.get_scheduler_version(), group.get_scheduler_states)
+    if not 0 <= car < group.get_car_count():
+        return jsonify({'error': 'Invalid car'}), 400
+    scheduler = group.get_car(car).scheduler
+    return versioned_json(f'scheduler_state-{car}', scheduler.get_version(), scheduler.get_state)
+
+
+@app.route('/elevator/snapshot', methods=['GET'])
+def get_snapshot():
+    """ Returns the clock, all cars and the statistics summary as of the same completed tick."""
+    snapshot = loop.snapshot
+    if snapshot is None:
+        return jsonify({'error': 'No tick has completed yet'}), 503
+    return versioned_json('snapshot', snapshot.tick, snapshot.to_dict)
 
 
 @app.route('/elevator/statistics', methods=['GET'])
 def get_stats():
     """ Returns the current statistics of the elevator."""
-    return jsonify(statistics.get())
+    # the heatmaps also change with the clock: midnight starts a new day and every hour drops the oldest one
+    version = f'{statistics.get_version()}.{statistics.get_current_hour()}'
+    return versioned_json('statistics', version, statistics.get)
+
+
+@app.route('/elevator/statistics/od', methods=['GET'])
+def get_od_matrix():
+    """ Returns the origin-destination matrix of all rides, its row and column sums and the busiest pairs."""
+    top = request.args.get('top', default=TOP_PAIRS, type=int)
+    if top < 0:
+        return jsonify({'error': 'Invalid top'}), 400
+    # there are no more pairs than matrix cells, and top is part of the version so it does not grow the cache
+    top = min(top, (statistics.floor_count + 1) ** 2)
+    version = f'{statistics.get_version()}.{top}'
+    return versioned_json('od', version, lambda: statistics.get_od_matrix(top))
+
+
+@app.route('/elevator/statistics/timeseries', methods=['GET'])
+def get_time_series():
+    """ Returns recent rides, queue lengths and cabin loads as a time series of one resolution."""
+    resolution = request.args.get('resolution', default='5m')
+    if resolution not in WINDOWS:
+        return jsonify({'error': f"Invalid resolution, use one of {', '.join(WINDOWS)}"}), 400
+    since = request.args.get('since', type=float)
+    # since is part of the version rather than the key, so arbitrary values do not grow the cache
+    version = f'{statistics.get_version()}.{statistics.get_sample_version()}.{since}'
+    return versioned_json(f'timeseries-{resolution}', version, lambda: statistics.get_time_series(resolution, since))
 
 
 @app.route('/elevator/log', methods=['GET'])
 def get_log():
-    """ Returns the current statistics of the elevator."""
-    return jsonify(ride_log.get())
+    """ Returns the logged rides, optionally filtered and paginated by query parameters."""
+    if not request.args:
+        return jsonify(ride_log.get())
+    # a malformed number is an error rather than a silently dropped filter
+    numbers = {}
+    for name in ('since', 'from', 'to', 'limit', 'start', 'end'):
+        value = request.args.get(name)
+        if value is None:
+            continue
+        try:
+            numbers[name] = int(value)
+        except ValueError:
+            return jsonify({'error': f'{name} must be an integer'}), 400
+    if numbers.get('limit', 0) < 0:
+        return jsonify({'error': 'limit must not be negative'}), 400
+    return jsonify(ride_log.query(
+        since=numbers.get('since'),
+        from_time=numbers.get('from'),
+        to_time=numbers.get('to'),
+        limit=numbers.get('limit', LOG_QUERY_LIMIT),
+        person_id=request.args.get('person_id'),
+        role=request.args.get('role'),
+        start=numbers.get('start'),
+        end=numbers.get('end'),
+    ))
 
 
 @app.route('/elevator/population', methods=['GET'])
 def get_population():
     """ Returns the current statistics of the elevator."""
-    return jsonify(population.get_population())
+    return versioned_json('population', population.get_version(), population.get_population)
 
 
 @app.route('/elevator/request_ride', methods=['GET'])
@@ -117,9 +262,6 @@ def request_ride():
     if not (0 <= start < building.number_of_floors and 0 <= end < building.number_of_floors):
         return jsonify({'error': 'Invalid floor range'}), 400
 
-    scheduler.handle_request(start, end)
-    statistics.track_ride(start, end)
-
     response = jsonify({'message': 'Ride requested successfully'})
 
     user_id = request.cookies.get("user_id")
@@ -128,11 +270,102 @@ def request_ride():
         response.set_cookie("user_id", user_id, max_age=60 * 60 * 24 * 365)
 
     person_id = sha256(user_id.encode("utf-8")).hexdigest()
-    ride_log.log_ride(start, end, person_id)
+    # applied by the simulation loop at the start of its next tick
+    loop.commands.put(start, end, person_id)
     return response
 
 
+@app.route('/elevator/request_rides', methods=['POST'])
+def request_rides():
+    """ Handles many ride requests at once, sent as a JSON array or as newline delimited JSON."""
+    body = request.get_data(as_text=True)
+    # indices of NDJSON lines that could not be parsed
+    unparsable = set()
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                unparsable.add(len(rows))
+                rows.append(None)
+    else:
+        try:
+            rows = json.loads(body)
+        except ValueError:
+            return jsonify({'error': 'Invalid JSON'}), 400
+        if not isinstance(rows, list):
+            return jsonify({'error': 'Expected an array of rides'}), 400
+
+    if len(rows) > BULK_RIDE_LIMIT:
+        return jsonify({'error': f'At most {BULK_RIDE_LIMIT} rides per request'}), 413
+
+    now = clock.get_elapsed_virtual_seconds()
+    commands = []
+    results = []
+    for index, row in enumerate(rows):
+        error = 'Invalid JSON' if index in unparsable else validate_ride(row)
+        if error:
+            results.append({'index': index, 'error': error})
+            continue
+        offset = row.get('offset', 0)
+        due = now + offset if offset else None
+        commands.append((row['start'], row['end'], row.get('person_id'), row.get('role'), due))
+        results.append({'index': index, 'status': 'accepted'})
+
+    # one batch, applied by the simulation loop in a single pass at its next tick
+    loop.commands.put_many(commands)
+    return jsonify({'accepted': len(commands), 'rejected': len(rows) - len(commands), 'results': results})
+
+
+def validate_ride(row):
+    """ Returns why a row of a bulk ride request is invalid, or None if it is valid."""
+    if not isinstance(row, dict):
+        return 'Ride must be a JSON object'
+    start = row.get('start')
+    end = row.get('end')
+    if start is None or end is None:
+        return 'Missing start or end floor'
+    if not all(isinstance(floor, int) and not isinstance(floor, bool) for floor in (start, end)):
+        return 'Floors must be integers'
+    if not (0 <= start < building.number_of_floors and 0 <= end < building.number_of_floors):
+        return 'Invalid floor range'
+    offset = row.get('offset', 0)
+    # json.loads accepts NaN and Infinity, rides with such offsets would never become due
+    if not isinstance(offset, (int, float)) or isinstance(offset, bool) or not (math.isfinite(offset) and offset >= 0):
+        return 'Offset must be a non-negative finite number of virtual seconds'
+    for field in ('person_id', 'role'):
+        if row.get(field) is not None and not isinstance(row[field], str):
+            return f'{field} must be a string'
+    return None
+
+
+@app.route('/elevator/ingress', methods=['GET'])
+def get_ingress():
+    """ Returns the depth and throughput of the queue of ride requests waiting for the simulation loop."""
+    return jsonify(loop.commands.get_state())
+
+
+@app.route('/elevator/metrics', methods=['GET'])
+def get_metrics():
+    """ Returns tick phase timings, ride counters and queue depths in the Prometheus text format."""
+    return Response(render_metrics(loop), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == "__main__":
-    loop_thread = threading.Thread(target=loop.run, daemon=True)
-    loop_thread.start()
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    parser = argparse.ArgumentParser(description="Runs the elevator simulation server.")
+    parser.add_argument('--server', choices=['flask', 'asgi'], default='flask',
+                        help="Serve with the Flask development server or with an asyncio based ASGI server.")
+    args = parser.parse_args()
+
+    if args.server == 'asgi':
+        # optional dependency, installed with: pip install -e .[asgi]
+        import uvicorn
+        from app.asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(app, loop), host='0.0.0.0', port=5000)
+    else:
+        loop_thread = threading.Thread(target=loop.run, daemon=True)
+        loop_thread.start()
+        app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,63 @@
+from typing import NamedTuple
+
+
+class Snapshot(NamedTuple):
+    """
+    The state of the whole simulation at the end of one tick. The loop builds a new snapshot every tick and
+    replaces its reference in one assignment, so readers on other threads always see the cars, the clock and
+    the statistics of the same tick without taking a lock. A published snapshot is never modified, so the
+    next one shares every part whose version did not change instead of building it again.
+    """
+    tick: int
+    current_time: str
+    elapsed_virtual_seconds: float
+    cars: tuple
+    statistics: dict
+    # (elevator version, scheduler version) of each car and the statistics version the parts were built at
+    car_versions: tuple = ()
+    statistics_version: int = -1
+
+    @classmethod
+    def capture(cls, tick, clock, group, statistics, previous=None):
+        """
+        :param previous: The snapshot of the previous tick. Cars and statistics that did not change since are reused.
+        """
+        cars = []
+        car_versions = []
+        for car in group.get_cars():
+            versions = (car.elevator.get_version(), car.scheduler.get_version())
+            if previous is None:
+                cars.append({
+                    "car": car.index, "cabin": car.elevator.get_state(), "scheduler": car.scheduler.get_state()
+                })
+            else:
+                # a moving car changes its cabin every tick, its scheduler only when requests arrive or are served
+                cabin_version, scheduler_version = previous.car_versions[car.index]
+                previous_car = previous.cars[car.index]
+                if (cabin_version, scheduler_version) == versions:
+                    cars.append(previous_car)
+                else:
+                    cars.append({
+                        "car": car.index,
+                        "cabin": previous_car["cabin"] if cabin_version == versions[0] else car.elevator.get_state(),
+                        "scheduler": (previous_car["scheduler"] if scheduler_version == versions[1]
+                                      else car.scheduler.get_state()),
+                    })
+            car_versions.append(versions)
+
+        statistics_version = statistics.get_version()
+        if previous is not None and previous.statistics_version == statistics_version:
+            summary = previous.statistics
+        else:
+            summary = statistics.get_summary()
+        return cls(tick, str(clock), clock.get_elapsed_virtual_seconds(), tuple(cars), summary,
+                   tuple(car_versions), statistics_version)
+
+    def to_dict(self):
+        return {
+            "tick": self.tick,
+            "current_time": self.current_time,
+            "elapsed_virtual_seconds": self.elapsed_virtual_seconds,
+            "cars": list(self.cars),
+            "statistics": self.statistics,
+        }
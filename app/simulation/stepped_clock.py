@@ -0,0 +1,22 @@
+from app.simulation.virtual_clock import VirtualClock
+
+
+class SteppedClock(VirtualClock):
+    """A virtual clock that only advances when it is stepped, independent of the wall clock."""
+
+    def __init__(self, scale=96):
+        """
+        :param scale: The factor that determines how fast the virtual time progresses per stepped real second.
+        """
+        self.elapsed_real_seconds = 0.0
+        super().__init__(scale)
+
+    def read_real_time(self):
+        """Returns the simulated real-world seconds the clock has been stepped by."""
+        return self.elapsed_real_seconds
+
+    def advance(self, real_seconds):
+        """Moves the clock forward by the given amount of simulated real-world seconds."""
+        self.elapsed_real_seconds += real_seconds
+        # time only passes here, so the new time can be served right away
+        self.tick()
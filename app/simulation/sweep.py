@@ -0,0 +1,95 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.people.roledistribution import resolve_role_distribution
+from app.simulation.engine import POPULATION_CLASSES, SCHEDULER_STRATEGIES, create_engine
+
+# Parameters a sweep grid may vary and the value used when the grid leaves them out
+GRID_DEFAULTS = {
+    "population_size": 100,
+    "max_load": 1200,
+    "scale": 120,
+    "car_count": 1,
+    "population_mode": "vectorized",
+    "scheduler": "scan",
+    "role_distribution": None,
+}
+
+
+def expand_grid(grid):
+    """
+    Expands a grid into one configuration per combination of parameter values and seed.
+    :param grid: Maps parameter names to a list of values. Also holds the list of "seeds" and the number of "days".
+    """
+    unknown = set(grid) - set(GRID_DEFAULTS) - {"seeds", "days"}
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    names = list(GRID_DEFAULTS)
+    values = [grid.get(name, [GRID_DEFAULTS[name]]) for name in names]
+    configurations = []
+    for combination in itertools.product(*values):
+        for seed in grid.get("seeds", [0]):
+            configuration = dict(zip(names, combination))
+            configuration["seed"] = seed
+            configuration["days"] = grid.get("days", 1)
+            configurations.append(configuration)
+    return configurations
+
+
+def run_configuration(configuration):
+    """Simulates the days of one configuration headless and summarizes its statistics as a flat row."""
+    engine = create_engine(
+        seed=configuration["seed"],
+        population_size=configuration["population_size"],
+        max_load=configuration["max_load"],
+        scale=configuration["scale"],
+        car_count=configuration["car_count"],
+        role_distribution=resolve_role_distribution(configuration["role_distribution"]),
+        population_class=POPULATION_CLASSES[configuration["population_mode"]],
+        scheduler_class=SCHEDULER_STRATEGIES[configuration["scheduler"]],
+        log_size=0,
+    )
+
+    started = time.perf_counter()
+    engine.run_days(configuration["days"])
+    elapsed = time.perf_counter() - started
+
+    statistics = engine.loop.statistics.get()
+    row = dict(configuration)
+    row.update({
+        "total_rides": statistics["total_rides"],
+        "average_distance": statistics["average_distance"],
+        "delivered": statistics["wait_time"]["count"],
+        "wait_p50": statistics["wait_time"]["p50"],
+        "wait_p90": statistics["wait_time"]["p90"],
+        "wait_p99": statistics["wait_time"]["p99"],
+        "journey_p50": statistics["journey_time"]["p50"],
+        "journey_p90": statistics["journey_time"]["p90"],
+        "journey_p99": statistics["journey_time"]["p99"],
+        "elapsed_seconds": elapsed,
+    })
+    return row
+
+
+def run_sweep(grid, workers=None, on_result=None):
+    """
+    Runs every configuration of the grid in a pool of worker processes, one simulation per process at a time.
+    :param workers: Number of worker processes, all cores if None.
+    :param on_result: Called with each row as soon as its configuration finished.
+    :return: The rows of all configurations in grid order.
+    """
+    configurations = expand_grid(grid)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(run_configuration, configuration): index
+                   for index, configuration in enumerate(configurations)}
+        rows = [None] * len(configurations)
+        # rows are reported in completion order, so a slow configuration does not hold back finished ones
+        for future in as_completed(futures):
+            row = future.result()
+            rows[futures[future]] = row
+            if on_result is not None:
+                on_result(row)
+    return rows
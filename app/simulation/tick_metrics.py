@@ -0,0 +1,124 @@
+from bisect import bisect_left
+
+# Phases of a simulation tick that are timed separately
+TICK_PHASES = ("commands", "population", "scheduling", "actuation", "trips", "sampling", "snapshot", "render")
+
+# Upper bounds in seconds of the duration histogram buckets, the last bucket is unbounded
+DURATION_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+class Histogram:
+    """A fixed-bucket histogram. Observing a value is a binary search and two additions."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels=""):
+        """Returns the histogram as lines of the Prometheus text format, with cumulative bucket counts."""
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.sum}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+
+class TickMetrics:
+    """Timings of every tick phase and counters of the ride requests passing through the loop."""
+
+    def __init__(self):
+        self.phases = {phase: Histogram() for phase in TICK_PHASES}
+        self.ticks = Histogram()
+        # how much longer than requested the loop slept between ticks
+        self.sleep_overshoot = Histogram()
+        self.rides_requested = 0
+        self.rides_served = 0
+
+    def observe_phase(self, phase, seconds):
+        self.phases[phase].observe(seconds)
+
+    def observe_tick(self, seconds):
+        self.ticks.observe(seconds)
+
+    def observe_sleep(self, requested_seconds, slept_seconds):
+        self.sleep_overshoot.observe(max(0.0, slept_seconds - requested_seconds))
+
+
+def render_metrics(loop):
+    """Renders the metrics of a simulation loop and the current queue depths in the Prometheus text format."""
+    metrics = loop.metrics
+    lines = [
+        "# HELP elevator_tick_phase_seconds Duration of each phase of a simulation tick.",
+        "# TYPE elevator_tick_phase_seconds histogram",
+    ]
+    for phase, histogram in metrics.phases.items():
+        lines.extend(histogram.render("elevator_tick_phase_seconds", f'phase="{phase}"'))
+    lines.extend([
+        "# HELP elevator_tick_seconds Duration of a complete simulation tick.",
+        "# TYPE elevator_tick_seconds histogram",
+        *metrics.ticks.render("elevator_tick_seconds"),
+        "# HELP elevator_sleep_overshoot_seconds Time the loop slept longer than requested between ticks.",
+        "# TYPE elevator_sleep_overshoot_seconds histogram",
+        *metrics.sleep_overshoot.render("elevator_sleep_overshoot_seconds"),
+        "# HELP elevator_rides_requested_total Ride requests submitted to the elevators.",
+        "# TYPE elevator_rides_requested_total counter",
+        f"elevator_rides_requested_total {metrics.rides_requested}",
+        "# HELP elevator_rides_served_total Passengers delivered to their destination.",
+        "# TYPE elevator_rides_served_total counter",
+        f"elevator_rides_served_total {metrics.rides_served}",
+        "# HELP elevator_waiting_passengers Passengers waiting at a floor, summed over all cars.",
+        "# TYPE elevator_waiting_passengers gauge",
+    ])
+
+    waiting = {}
+    riding = []
+    for car in loop.group.get_cars():
+        in_cabin = 0
+        for floor, up, down, stop in car.scheduler.get_queue_lengths():
+            waiting[floor, "up"] = waiting.get((floor, "up"), 0) + up
+            waiting[floor, "down"] = waiting.get((floor, "down"), 0) + down
+            in_cabin += stop
+        riding.append(in_cabin)
+    for (floor, direction), count in sorted(waiting.items()):
+        lines.append(f'elevator_waiting_passengers{{floor="{floor}",direction="{direction}"}} {count}')
+
+    lines.extend([
+        "# HELP elevator_cabin_passengers Passengers riding in each car.",
+        "# TYPE elevator_cabin_passengers gauge",
+        *(f'elevator_cabin_passengers{{car="{car}"}} {count}' for car, count in enumerate(riding)),
+        "# HELP elevator_command_queue_depth Ride requests waiting for the simulation loop.",
+        "# TYPE elevator_command_queue_depth gauge",
+        f"elevator_command_queue_depth {loop.commands.get_depth()}",
+        "# HELP elevator_stream_subscribers Clients connected to the elevator stream.",
+        "# TYPE elevator_stream_subscribers gauge",
+        f"elevator_stream_subscribers {loop.broadcaster.get_subscriber_count()}",
+    ])
+
+    # only a sharded population reports how its evaluation is spread over the worker processes
+    if hasattr(loop.population, "get_shard_timings"):
+        shards = loop.population.get_shard_timings()["shards"]
+        lines.extend([
+            "# HELP elevator_population_shard_seconds_total Time each population shard spent evaluating its people.",
+            "# TYPE elevator_population_shard_seconds_total counter",
+            *(f'elevator_population_shard_seconds_total{{shard="{shard["shard"]}"}} {shard["seconds"]}'
+              for shard in shards),
+            "# HELP elevator_population_shard_people People evaluated by each population shard.",
+            "# TYPE elevator_population_shard_people gauge",
+            *(f'elevator_population_shard_people{{shard="{shard["shard"]}"}} {shard["people"]}' for shard in shards),
+        ])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,109 @@
+import struct
+
+# Identifies a ride trace file and its format version
+MAGIC = b"ELVTRC01"
+
+# Record tags. A name record introduces the next index of a name table, a ride record refers to it.
+NAME_RECORD = 0
+RIDE_RECORD = 1
+PERSON_TABLE = 0
+ROLE_TABLE = 1
+
+TAG = struct.Struct("<B")
+# table, length of the UTF-8 encoded name
+NAME = struct.Struct("<BH")
+# elapsed virtual seconds, start floor, end floor, person index, role index
+RIDE = struct.Struct("<dHHii")
+
+# Index stored for rides without a person or role
+NO_NAME = -1
+
+
+class TraceRecorder:
+    """
+    Writes every ride request submitted to the elevators to a compact binary trace. Person ids and roles
+    are written once and referred to by index, so a ride costs TAG.size + RIDE.size = 21 bytes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.names = ({}, {})
+        self.count = 0
+
+    def record(self, virtual_time, start, end, person_id=None, role=None):
+        """
+        :param virtual_time: The elapsed virtual seconds at which the request was submitted.
+        """
+        person = self.get_index(PERSON_TABLE, person_id)
+        role = self.get_index(ROLE_TABLE, role)
+        self.file.write(TAG.pack(RIDE_RECORD) + RIDE.pack(virtual_time, start, end, person, role))
+        self.count += 1
+
+    def get_index(self, table, name):
+        """Returns the index of a name, writing a name record the first time it is seen."""
+        if name is None:
+            return NO_NAME
+        name = str(name)
+        indices = self.names[table]
+        index = indices.get(name)
+        if index is None:
+            index = len(indices)
+            indices[name] = index
+            encoded = name.encode("utf-8")
+            self.file.write(TAG.pack(NAME_RECORD) + NAME.pack(table, len(encoded)) + encoded)
+        return index
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_trace(path):
+    """Yields the rides of a trace as (virtual_time, start, end, person_id, role) rows in recording order."""
+    names = ([], [])
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a ride trace")
+        while tag := file.read(TAG.size):
+            if TAG.unpack(tag)[0] == NAME_RECORD:
+                table, length = NAME.unpack(file.read(NAME.size))
+                names[table].append(file.read(length).decode("utf-8"))
+                continue
+            virtual_time, start, end, person, role = RIDE.unpack(file.read(RIDE.size))
+            yield (
+                virtual_time, start, end,
+                names[PERSON_TABLE][person] if person != NO_NAME else None,
+                names[ROLE_TABLE][role] if role != NO_NAME else None,
+            )
+
+
+class TraceReplayer:
+    """
+    Plays a recorded trace back as a population, so a scheduler can be run on exactly the traffic of an
+    earlier run. Each ride is submitted in the first tick at or after the virtual time it was recorded at.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rides = read_trace(path)
+        self.next_ride = next(self.rides, None)
+        self.replayed = 0
+
+    def get_requests(self, clock):
+        current_time = clock.get_elapsed_virtual_seconds()
+        requests = []
+        while self.next_ride is not None and self.next_ride[0] <= current_time:
+            requests.append(self.next_ride[1:])
+            self.next_ride = next(self.rides, None)
+        self.replayed += len(requests)
+        return requests
+
+    def is_exhausted(self):
+        return self.next_ride is None
@@ -1,8 +1,18 @@
-from datetime import datetime
+import math
+import threading
+import time
+
+MINUTES_PER_DAY = 24 * 60
+SECONDS_PER_DAY = MINUTES_PER_DAY * 60
 
 
 class VirtualClock:
-    """A virtual clock that maps real-world time to a compressed virtual day."""
+    """
+    A virtual clock that maps real-world time to a compressed virtual day.
+    The real time is read once per tick and the resulting virtual time is frozen until the next tick,
+    so every reader within a tick sees the same time. The clock can be paused, resumed and rescaled
+    while running without the virtual time jumping.
+    """
 
     def __init__(self, scale=96):
         """
@@ -10,26 +20,93 @@ class VirtualClock:
                       A scale of 60 means 1 real second = 1 virtual minute.
         """
         self.scale = scale
-        self.start_time = datetime.now()
+        self.paused = False
+        self.start_time = self.read_real_time()
+        # virtual seconds reached at the last pause, resume or rescale and the real time it happened at
+        self.base_virtual_seconds = 0.0
+        self.base_real_time = self.start_time
+        # virtual seconds of the current tick
+        self.virtual_seconds = 0.0
+        # pause, resume and rescale are called from request threads while the loop ticks
+        self.lock = threading.Lock()
+
+    def read_real_time(self):
+        """Returns the real-world time in seconds from a monotonic source."""
+        return time.monotonic()
+
+    def read_virtual_seconds(self, real_time):
+        if self.paused:
+            return self.base_virtual_seconds
+        return self.base_virtual_seconds + (real_time - self.base_real_time) * self.scale
+
+    def tick(self):
+        """Reads the real time once and freezes the virtual time all getters return until the next tick."""
+        with self.lock:
+            self.virtual_seconds = self.read_virtual_seconds(self.read_real_time())
+        return self.virtual_seconds
+
+    def rebase(self):
+        """Starts measuring from now, keeping the virtual time reached so far. Called with the lock held."""
+        now = self.read_real_time()
+        self.base_virtual_seconds = self.read_virtual_seconds(now)
+        self.base_real_time = now
+
+    def pause(self):
+        """Stops the virtual time until resume() is called."""
+        with self.lock:
+            self.rebase()
+            self.paused = True
+
+    def resume(self):
+        with self.lock:
+            self.rebase()
+            self.paused = False
+
+    def set_scale(self, scale):
+        """Changes how fast the virtual time progresses from now on."""
+        if not (math.isfinite(scale) and scale > 0):
+            raise ValueError("The scale has to be a positive finite number")
+        with self.lock:
+            self.rebase()
+            self.scale = scale
+
+    def is_paused(self):
+        return self.paused
+
+    def get_elapsed_real_seconds(self):
+        """Returns the real-world seconds elapsed since the clock was started."""
+        return self.read_real_time() - self.start_time
 
     def get_virtual_seconds(self):
-        """Calculates the virtual seconds based on real-world elapsed time."""
-        elapsed_real_seconds = (datetime.now() - self.start_time).total_seconds()
-        virtual_seconds = int((elapsed_real_seconds * self.scale) % 60)
-        return virtual_seconds
+        """Returns the seconds (0-59) of the current virtual minute."""
+        return int(self.virtual_seconds % 60)
 
     def get_virtual_minutes(self):
-        """Calculates the virtual minutes based on real-world elapsed time."""
-        elapsed_real_seconds = (datetime.now() - self.start_time).total_seconds()
-        virtual_minutes = int((elapsed_real_seconds / 60) * self.scale) % (24 * 60)
-        return virtual_minutes
+        """Returns the minutes elapsed since virtual midnight."""
+        return self.get_virtual_minutes_since_epoch() % MINUTES_PER_DAY
+
+    def get_virtual_minutes_since_epoch(self):
+        """Returns the virtual minutes elapsed since the clock was started, without wrapping at midnight."""
+        return int(self.virtual_seconds // 60)
 
     def get_virtual_hour(self):
         """Returns the current virtual hour (0-23)."""
         return self.get_virtual_minutes() // 60
 
+    def get_elapsed_virtual_seconds(self):
+        """Returns the exact virtual seconds elapsed since the clock was started, suitable for measuring durations."""
+        return self.virtual_seconds
+
     def get_virtual_seconds_since_epoch(self):
-        return int((datetime.now() - self.start_time).total_seconds()) * self.scale
+        return int(self.virtual_seconds)
+
+    def get_state(self):
+        return {
+            "time": str(self),
+            "elapsed_virtual_seconds": self.virtual_seconds,
+            "scale": self.scale,
+            "paused": self.paused,
+        }
 
     def __str__(self):
         """Returns the current virtual time in HH:MM:SS format."""
@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    A log-bucketed histogram in the style of HDR histograms and DDSketch. Quantiles are answered within a
+    fixed relative error while memory stays constant no matter how many values are added.
+    """
+
+    def __init__(self, relative_error=0.01, max_value=1e7):
+        """
+        :param relative_error: The maximum relative error of the reported quantiles.
+        :param max_value: Values above this are counted in the last bucket.
+        """
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        # bucket i holds values in (gamma^(i-1), gamma^i], values below 1 go to bucket 0
+        self.counts = np.zeros(math.ceil(math.log(max_value) / self.log_gamma) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        if value > 1:
+            index = min(math.ceil(math.log(value) / self.log_gamma), len(self.counts) - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += float(value)
+
+    def quantile(self, q):
+        """Returns an estimate of the q-quantile (0 <= q <= 1) of all values added, or 0 if there are none."""
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank, side="right"))
+        if index == 0:
+            return 0
+        # midpoint of the bucket in terms of relative error
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def get_summary(self):
+        """Returns the count, mean and the 50th, 90th and 99th percentile of all values added."""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
@@ -1,16 +1,48 @@
-import json
-from collections import deque
+from array import array
+from bisect import bisect_left
 from datetime import datetime
 
+import numpy as np
+
+# Ride fields with a secondary index, mapped to the store column holding them
+INDEXED_FIELDS = {
+    "person_id": "person",
+    "role": "role",
+    "start": "start",
+    "end": "end",
+}
+
+# Rides of a store whose columns are compared at once while scanning for filter matches
+SCAN_CHUNK = 1 << 16
+
 
 class RideLog:
-    def __init__(self, clock, size=1000):
+    def __init__(self, clock, size=1000, store=None):
         """
         Initializes the RideLog object to track the last 1000 rides.
         :param clock: An optional clock object with a getter method returning the current time.
+        :param size: The number of rides kept before the oldest are dropped. None keeps every ride.
+        :param store: An optional RideStore persisting every ride to disk. With a store, size only limits how
+                      many of the latest rides get() returns.
         """
         self.clock = clock
-        self.rides = deque(maxlen=size)
+        self.size = size
+        self.store = store
+        # Evicted rides are only dropped from the front of the list and the indexes once they add up to size,
+        # so an eviction costs nothing per ride and every position can still be read in O(1) for binary search
+        self.rides = [] if store is None else None
+        # sequence number of the first entry of rides, evicted or not
+        self.rides_start = 0
+        # sequence number the next ride gets
+        self.next_sequence = 0 if store is None else len(store)
+        # The virtual clock of a new run starts at 0 again. Rides appended to an existing store continue after
+        # its last stored time, so the time column stays ordered and from/to queries can binary search it.
+        self.time_base = 0
+        if store is not None and len(store):
+            self.time_base = int(store.columns["virtual_time"][len(store) - 1])
+        # field -> value -> ascending sequence numbers of the in-memory rides with that value. A store keeps
+        # its history off the heap, its queries scan the memory-mapped columns instead.
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
 
     def log_ride(self, start, end, person_id=None, role=None):
         """
@@ -19,19 +51,180 @@ class RideLog:
         :param end: The destination floor
         :param id: Unique id of the user requesting the ride
         """
+        virtual_time = self.clock.get_virtual_seconds_since_epoch()
+        real_time = int(datetime.now().timestamp())
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        if self.store is not None:
+            self.store.append(virtual_time + self.time_base, real_time, start, end, role, person_id)
+            return
+        # a log of size 0 only counts rides
+        if self.size == 0:
+            return
+
         ride_entry = {
-            "virtual_time": self.clock.get_virtual_seconds_since_epoch(),
-            "real_time": int(datetime.now().timestamp()),
+            "sequence": sequence,
+            "virtual_time": virtual_time,
+            "real_time": real_time,
             "start": start,
             "end": end,
             "person_id": person_id,
             "role": role
         }
         self.rides.append(ride_entry)
+        self.index_ride(ride_entry)
+        if self.size is not None and len(self.rides) >= 2 * self.size:
+            self.trim()
+
+    def index_ride(self, ride):
+        for field in INDEXED_FIELDS:
+            value = ride[field]
+            if value is None:
+                continue
+            key = index_key(field, value)
+            sequences = self.indexes[field].get(key)
+            if sequences is None:
+                sequences = array("q")
+                self.indexes[field][key] = sequences
+            sequences.append(ride["sequence"])
+
+    def trim(self):
+        """Drops the evicted rides from the front of the ride list and of every index list."""
+        first = self.get_first_sequence()
+        del self.rides[:first - self.rides_start]
+        self.rides_start = first
+        for index in self.indexes.values():
+            for key, sequences in list(index.items()):
+                evicted = bisect_left(sequences, first)
+                if evicted == len(sequences):
+                    del index[key]
+                elif evicted:
+                    del sequences[:evicted]
+
+    def get_first_sequence(self):
+        """Returns the sequence number of the oldest ride still available."""
+        if self.store is not None or self.size is None:
+            return 0
+        return max(0, self.next_sequence - self.size)
+
+    def get_next_sequence(self):
+        """Returns the sequence number the next ride gets. A store may be written by another process."""
+        if self.store is not None:
+            return len(self.store)
+        return self.next_sequence
+
+    def get_ride(self, sequence):
+        if self.store is not None:
+            ride = self.store.read(sequence, sequence + 1)[0]
+            ride["sequence"] = sequence
+            return ride
+        return self.rides[sequence - self.rides_start]
+
+    def get_virtual_time(self, sequence):
+        if self.store is not None:
+            return int(self.store.columns["virtual_time"][sequence])
+        return self.rides[sequence - self.rides_start]["virtual_time"]
+
+    def find_time(self, virtual_time, low, high):
+        """Returns the first sequence number in [low, high) logged at or after virtual_time."""
+        # rides are logged in order of the monotonic virtual clock
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_virtual_time(middle) < virtual_time:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def scan_store(self, filters, low, high, reverse):
+        """
+        Yields the sequence numbers in [low, high) of stored rides matching all filters. The memory-mapped
+        columns are compared a chunk at a time, so the heap only ever holds one chunk of matches.
+        """
+        values = {}
+        for field, key in filters.items():
+            column = INDEXED_FIELDS[field]
+            if column == "role":
+                key = self.store.roles.find_index(key)
+            elif column == "person":
+                key = self.store.persons.find_index(key)
+            # a name the store has never seen matches no ride
+            if key is None:
+                return
+            values[column] = key
+        if high > self.store.capacity:
+            # the writer grew the files since they were mapped
+            self.store.open_columns(high)
+
+        chunks = range(low, high, SCAN_CHUNK)
+        for first in (reversed(chunks) if reverse else chunks):
+            last = min(first + SCAN_CHUNK, high)
+            matches = np.ones(last - first, dtype=bool)
+            for column, value in values.items():
+                matches &= self.store.columns[column][first:last] == value
+            sequences = (np.flatnonzero(matches) + first).tolist()
+            yield from (reversed(sequences) if reverse else sequences)
+
+    def query(self, since=None, from_time=None, to_time=None, limit=None, **filters):
+        """
+        Returns the rides matching all given filters in chronological order. In memory the cost is proportional
+        to the number of rides of the most selective index rather than to the size of the log.
+        :param since: Only rides with a sequence number greater than this cursor. Without a cursor the latest
+                      matches are returned, with one the first matches after it.
+        :param from_time: Only rides logged at or after this virtual time.
+        :param to_time: Only rides logged before this virtual time.
+        :param limit: The maximum number of rides returned.
+        :param filters: Values the indexed fields person_id, role, start and end have to match.
+        """
+        low = self.get_first_sequence()
+        high = self.get_next_sequence()
+        if since is not None:
+            low = max(low, since + 1)
+        if from_time is not None:
+            low = self.find_time(from_time, low, high)
+        if to_time is not None:
+            high = self.find_time(to_time, low, high)
+
+        filters = {field: index_key(field, value) for field, value in filters.items() if value is not None}
+        if filters and self.store is not None:
+            sequences = self.scan_store(filters, low, high, reverse=since is None)
+        elif filters:
+            # walk the shortest index list and check the remaining filters on each ride
+            candidates = min((self.indexes[field].get(key, ()) for field, key in filters.items()), key=len)
+            first = bisect_left(candidates, low)
+            last = bisect_left(candidates, high)
+            positions = range(first, last) if since is not None else range(last - 1, first - 1, -1)
+            sequences = (candidates[position] for position in positions)
+        else:
+            sequences = range(low, high) if since is not None else range(high - 1, low - 1, -1)
+
+        rides = []
+        for sequence in sequences:
+            if limit is not None and len(rides) >= limit:
+                break
+            ride = self.get_ride(sequence)
+            if all(index_key(field, ride[field]) == key for field, key in filters.items()):
+                rides.append(ride)
+        if since is None:
+            rides.reverse()
+        return rides
 
     def get(self):
         """
         Returns the last 1000 rides as a list of dictionaries.
         """
-        return list(self.rides)
+        if self.store is not None:
+            count = len(self.store)
+            first = 0 if self.size is None else max(0, count - self.size)
+            rides = self.store.read(first, count)
+            for sequence, ride in enumerate(rides, first):
+                ride["sequence"] = sequence
+            return rides
+        return self.rides[self.get_first_sequence() - self.rides_start:]
+
 
+def index_key(field, value):
+    # floors are compared as numbers, names such as person ids as strings
+    if field in ("start", "end"):
+        return int(value)
+    return str(value)
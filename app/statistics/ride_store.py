@@ -0,0 +1,166 @@
+import os
+
+import numpy as np
+
+# Fixed-width columns of a ride record and their on-disk types
+COLUMNS = {
+    "virtual_time": np.int64,
+    "real_time": np.int64,
+    "start": np.int32,
+    "end": np.int32,
+    "role": np.int32,
+    "person": np.int32,
+}
+
+# Index stored for rides without a role or person
+NO_NAME = -1
+
+
+class NameTable:
+    """An append-only text file mapping names such as roles or person ids to dense integer indices."""
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.names = []
+        self.indices = {}
+        self.loaded_bytes = 0
+        self.reload()
+
+    def reload(self):
+        """Picks up names appended to the file since it was last read, e.g. by another process."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            file.seek(self.loaded_bytes)
+            data = file.read()
+        # only consume complete lines, a writer may be in the middle of one
+        data = data[:data.rfind(b"\n") + 1]
+        self.loaded_bytes += len(data)
+        for name in data.decode("utf-8").splitlines():
+            self.indices[name] = len(self.names)
+            self.names.append(name)
+
+    def get_index(self, name):
+        """Returns the index of a name, appending it to the table if it is new."""
+        if name is None:
+            return NO_NAME
+        name = str(name)
+        index = self.indices.get(name)
+        if index is None:
+            index = len(self.names)
+            self.names.append(name)
+            self.indices[name] = index
+            line = (name + "\n").encode("utf-8")
+            with open(self.path, "ab") as file:
+                file.write(line)
+            # the line is known already, a later reload must not read it again
+            self.loaded_bytes += len(line)
+        return index
+
+    def find_index(self, name):
+        """Returns the index of a name without adding it, or None if the table does not know it."""
+        index = self.indices.get(name)
+        if index is None:
+            self.reload()
+            index = self.indices.get(name)
+        return index
+
+    def get_name(self, index):
+        if index == NO_NAME:
+            return None
+        if index >= len(self.names):
+            self.reload()
+        return self.names[index]
+
+
+class RideStore:
+    """
+    Stores rides as fixed-width records in one memory-mapped file per column. Files grow by doubling,
+    so appending costs no heap memory per ride. Other processes can read the store by opening the
+    same directory with readonly=True.
+    """
+
+    def __init__(self, directory, capacity=65536, readonly=False):
+        """
+        :param directory: Directory holding the column files. It is created if it does not exist.
+        :param capacity: Number of records space is reserved for when the store is created.
+        :param readonly: Opens an existing store for reading only.
+        """
+        self.directory = directory
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        mode = "r" if readonly else "r+"
+
+        count_path = os.path.join(directory, "count.bin")
+        if not readonly and not os.path.exists(count_path):
+            np.zeros(1, dtype=np.int64).tofile(count_path)
+        # number of complete records, written after the record itself
+        self.count = np.memmap(count_path, dtype=np.int64, mode=mode, shape=(1,))
+
+        self.roles = NameTable(os.path.join(directory, "roles.txt"), readonly)
+        self.persons = NameTable(os.path.join(directory, "persons.txt"), readonly)
+        self.capacity = 0
+        self.columns = {}
+        self.open_columns(max(capacity, 1))
+
+    def open_columns(self, capacity):
+        """Maps every column file, growing the files to hold at least capacity records."""
+        mode = "r" if self.readonly else "r+"
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(self.directory, f"{name}.bin")
+            item_size = np.dtype(dtype).itemsize
+            size = os.path.getsize(path) // item_size if os.path.exists(path) else 0
+            if not self.readonly and size < capacity:
+                with open(path, "ab") as file:
+                    file.truncate(capacity * item_size)
+                size = capacity
+            self.columns[name] = np.memmap(path, dtype=dtype, mode=mode, shape=(size,))
+        self.capacity = min(len(column) for column in self.columns.values())
+
+    def __len__(self):
+        return int(self.count[0])
+
+    def append(self, virtual_time, real_time, start, end, role=None, person_id=None):
+        """Appends a ride and returns its sequence number."""
+        index = len(self)
+        if index >= self.capacity:
+            self.open_columns(self.capacity * 2)
+
+        self.columns["virtual_time"][index] = virtual_time
+        self.columns["real_time"][index] = real_time
+        self.columns["start"][index] = start
+        self.columns["end"][index] = end
+        self.columns["role"][index] = self.roles.get_index(role)
+        self.columns["person"][index] = self.persons.get_index(person_id)
+        self.count[0] = index + 1
+        return index
+
+    def read(self, first, last):
+        """Returns the rides with sequence numbers from first up to, but excluding, last as dictionaries."""
+        last = min(last, len(self))
+        if first >= last:
+            return []
+        if last > self.capacity:
+            # the writer grew the files since they were mapped
+            self.open_columns(last)
+
+        rows = {name: column[first:last].tolist() for name, column in self.columns.items()}
+        return [
+            {
+                "virtual_time": rows["virtual_time"][row],
+                "real_time": rows["real_time"][row],
+                "start": rows["start"][row],
+                "end": rows["end"][row],
+                "person_id": self.persons.get_name(rows["person"][row]),
+                "role": self.roles.get_name(rows["role"][row]),
+            }
+            for row in range(last - first)
+        ]
+
+    def flush(self):
+        """Writes all mapped pages back to disk."""
+        for column in self.columns.values():
+            column.flush()
+        self.count.flush()
@@ -0,0 +1,100 @@
+from array import array
+
+import numpy as np
+
+from app.simulation.virtual_clock import SECONDS_PER_DAY
+
+# Name -> (seconds per bin, number of bins kept)
+WINDOWS = {
+    "1m": (60, 120),  # the last two hours
+    "5m": (5 * 60, 288),  # the last day
+    "1h": (60 * 60, 7 * 24),  # the last week
+}
+
+
+class RollingWindow:
+    """
+    Ride counts and sampled queue lengths and cabin loads in fixed-width bins of virtual time. The bins
+    live in a ring buffer, so a bin is reused once it is older than the window and memory stays bounded.
+    Bins are aligned to virtual midnight, every bin belongs to exactly one virtual day.
+    """
+
+    def __init__(self, resolution, length, floor_count, car_count):
+        """
+        :param resolution: Virtual seconds covered by a bin.
+        :param length: Number of bins kept.
+        """
+        self.resolution = resolution
+        self.length = length
+        # absolute bin number held by each slot, -1 for slots never used
+        self.bins = array("q", [-1]) * length
+        self.rides = array("q", bytes(8 * length))
+        self.samples = array("q", bytes(8 * length))
+        # sums of the sampled waiting passengers per floor and cabin loads per car
+        self.waiting = np.zeros((length, floor_count + 1))
+        self.load = np.zeros((length, car_count))
+
+    def get_slot(self, virtual_seconds):
+        """Returns the slot of the bin holding the given time, clearing it if it still holds an older bin."""
+        number = int(virtual_seconds // self.resolution)
+        slot = number % self.length
+        if self.bins[slot] != number:
+            self.bins[slot] = number
+            self.rides[slot] = 0
+            self.samples[slot] = 0
+            self.waiting[slot] = 0
+            self.load[slot] = 0
+        return slot
+
+    def count_ride(self, virtual_seconds):
+        self.rides[self.get_slot(virtual_seconds)] += 1
+
+    def add_sample(self, virtual_seconds, waiting, load):
+        """
+        :param waiting: Passengers waiting at each floor.
+        :param load: Load of each car in kg.
+        """
+        slot = self.get_slot(virtual_seconds)
+        self.samples[slot] += 1
+        self.waiting[slot] += waiting
+        self.load[slot] += load
+
+    def get_day_counts(self, day):
+        """Returns the rides of each bin of the given virtual day that is still in the window."""
+        bins_per_day = SECONDS_PER_DAY // self.resolution
+        first = day * bins_per_day
+        return {
+            number - first: self.rides[slot]
+            for slot, number in enumerate(self.bins)
+            if first <= number < first + bins_per_day and self.rides[slot]
+        }
+
+    def get_series(self, since=None):
+        """
+        Returns the bins in chronological order with their ride counts and the mean sampled queue lengths and loads.
+        :param since: Only bins starting at or after this many elapsed virtual seconds.
+        """
+        bins = np.frombuffer(self.bins, dtype=np.int64)
+        slots = np.flatnonzero(bins >= 0)
+        if since is not None:
+            slots = slots[bins[slots] * self.resolution >= since]
+        slots = slots[np.argsort(bins[slots])]
+        samples = np.frombuffer(self.samples, dtype=np.int64)[slots, None]
+        # means of the samples, 0 for bins that only counted rides
+        waiting = np.divide(self.waiting[slots], samples, out=np.zeros_like(self.waiting[slots]), where=samples > 0)
+        load = np.divide(self.load[slots], samples, out=np.zeros_like(self.load[slots]), where=samples > 0)
+
+        series = []
+        for row, slot in enumerate(slots.tolist()):
+            start = self.bins[slot] * self.resolution
+            day, second = divmod(start, SECONDS_PER_DAY)
+            series.append({
+                "start": start,
+                "day": day,
+                "time": f"{second // 3600:02}:{second // 60 % 60:02}",
+                "rides": self.rides[slot],
+                "samples": self.samples[slot],
+                "waiting": waiting[row].tolist(),
+                "load": load[row].tolist(),
+            })
+        return series
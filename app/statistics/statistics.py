@@ -1,19 +1,54 @@
+from array import array
 from collections import defaultdict
 
+import numpy as np
+
+from app.simulation.virtual_clock import SECONDS_PER_DAY
+from app.statistics.quantile_sketch import QuantileSketch
+from app.statistics.rolling_window import WINDOWS, RollingWindow
+
+# Number of origin-destination pairs returned by default
+TOP_PAIRS = 10
+
 
 class Statistics:
-    def __init__(self, clock):
+    def __init__(self, clock, floor_count, car_count=1):
         """
         Initializes the Statistics object.
         :param clock: An optional clock object with a getter method returning the current time.
+        :param floor_count: The floor count the elevators are built with, i.e. building.number_of_floors. Like the
+                            schedulers, rides between floors 0 to floor_count are tracked.
+        :param car_count: The number of elevator cars whose loads are sampled.
         """
         self.clock = clock
-        self.departures = defaultdict(int)  # Tracks departure floor counts
-        self.destinations = defaultdict(int)  # Tracks destination floor counts
+        self.floor_count = floor_count
+        # Rides per origin (row) and destination (column) floor, departures and destinations are its sums.
+        # Rides are counted in a flat array, the matrix is a NumPy view of the same memory for vectorized reads,
+        # incrementing an array item is several times cheaper than indexing into a NumPy array.
+        self.od_counts = array("q", bytes(8 * (floor_count + 1) ** 2))
+        self.od_matrix = np.frombuffer(self.od_counts, dtype=np.int64).reshape(floor_count + 1, floor_count + 1)
+        # Floors travelled by a ride between each origin and destination
+        floors = np.arange(floor_count + 1)
+        self.distances = np.abs(floors[:, None] - floors[None, :])
         self.total_rides = 0  # Total number of rides
-        self.ride_timestamps = defaultdict(int)  # Heatmap data for 1-hour bins
+        # Rides, queue lengths and loads over the recent past at several resolutions, split by virtual day
+        self.windows = {
+            name: RollingWindow(resolution, length, floor_count, car_count)
+            for name, (resolution, length) in WINDOWS.items()
+        }
         self.total_distance = 0  # Total distance traveled
-        self.distance_by_floor = defaultdict(lambda: {'total_from_distance': 0, 'total_to_distance': 0, 'from_count': 0, 'to_count': 0})
+        # Virtual seconds from request to boarding, overall, by role and by departure floor
+        self.wait_times = QuantileSketch()
+        self.wait_times_by_role = defaultdict(QuantileSketch)
+        self.wait_times_by_floor = defaultdict(QuantileSketch)
+        # Virtual seconds from request to arrival, overall, by role and by destination floor
+        self.journey_times = QuantileSketch()
+        self.journey_times_by_role = defaultdict(QuantileSketch)
+        self.journey_times_by_floor = defaultdict(QuantileSketch)
+        # increased whenever a ride or journey is tracked
+        self.version = 0
+        # increased whenever queue lengths and loads are sampled
+        self.sample_version = 0
 
     def track_ride(self, start, end):
         """
@@ -24,21 +59,82 @@ class Statistics:
         if start == end:
             return  # Ignore rides with no movement
 
-        self.departures[start] += 1
-        self.destinations[end] += 1
+        self.od_counts[start * (self.floor_count + 1) + end] += 1
         self.total_rides += 1
 
-        # Track ride in hourly heatmap
-        hour_bin = self.clock.get_virtual_hour()
-        self.ride_timestamps[hour_bin] += 1
+        # Track ride in the rolling windows, the hourly one doubles as heatmap
+        now = self.clock.get_elapsed_virtual_seconds()
+        for window in self.windows.values():
+            window.count_ride(now)
+
+        # Per-floor distances are derived from the matrix when read
+        self.total_distance += abs(end - start)
+        # bumped last, so a reader caching under the new version never sees a partial update
+        self.version += 1
+
+    def track_journey(self, origin, destination, role, wait_time, journey_time):
+        """
+        Tracks the timing of a delivered passenger.
+        :param origin: The floor the passenger boarded at
+        :param destination: The floor the passenger left the cabin at
+        :param role: The role of the passenger or None if unknown
+        :param wait_time: Virtual seconds between the request and boarding
+        :param journey_time: Virtual seconds between the request and arrival at the destination
+        """
+        self.wait_times.add(wait_time)
+        self.wait_times_by_floor[origin].add(wait_time)
+        self.journey_times.add(journey_time)
+        self.journey_times_by_floor[destination].add(journey_time)
+        if role is not None:
+            self.wait_times_by_role[role].add(wait_time)
+            self.journey_times_by_role[role].add(journey_time)
+        self.version += 1
+
+    def get_floor_counts(self, counts):
+        """
+        Returns the non-zero per-floor counts as a dictionary.
+        """
+        floors = np.flatnonzero(counts)
+        return dict(zip(floors.tolist(), counts[floors].tolist()))
+
+    def get_version(self):
+        return self.version
+
+    def track_sample(self, waiting, load):
+        """
+        Samples the current state of the elevators into the rolling windows, called once per tick.
+        :param waiting: Passengers waiting at each floor.
+        :param load: Load of each car in kg.
+        """
+        now = self.clock.get_elapsed_virtual_seconds()
+        for window in self.windows.values():
+            window.add_sample(now, waiting, load)
+        self.sample_version += 1
+
+    def get_sample_version(self):
+        return self.sample_version
 
-        # Track total and per-floor travel distances
-        distance = abs(end - start)
-        self.total_distance += distance
-        self.distance_by_floor[start]['total_from_distance'] += distance
-        self.distance_by_floor[start]['from_count'] += 1
-        self.distance_by_floor[end]['total_to_distance'] += distance
-        self.distance_by_floor[end]['to_count'] += 1
+    def get_time_series(self, resolution, since=None):
+        """
+        Returns the bins of one rolling window in chronological order.
+        :param resolution: The name of the window, one of WINDOWS.
+        :param since: Only bins starting at or after this many elapsed virtual seconds.
+        """
+        window = self.windows[resolution]
+        return {
+            "resolution": resolution,
+            "bin_seconds": window.resolution,
+            "bins": window.get_series(since),
+        }
+
+    def get_time_percentiles(self, overall, by_role, by_floor):
+        """
+        Returns the percentile summary of a duration overall, by role and by floor.
+        """
+        summary = overall.get_summary()
+        summary["by_role"] = {role: sketch.get_summary() for role, sketch in by_role.items()}
+        summary["by_floor"] = {floor: sketch.get_summary() for floor, sketch in by_floor.items()}
+        return summary
 
     def get_average_distance(self):
         """
@@ -52,43 +148,95 @@ class Statistics:
         """
         Returns a dictionary mapping each floor to its average travel distance.
         """
-        avg_distances = {}
-        for floor, data in self.distance_by_floor.items():
-            if data['to_count'] > 0:
-                avg_distances[floor] = data['total_to_distance'] / data['to_count']
-            else:
-                avg_distances[floor] = 0
-        return avg_distances
+        counts = self.od_matrix.sum(axis=0)
+        distances = (self.od_matrix * self.distances).sum(axis=0)
+        return self.get_floor_averages(distances, counts)
 
     def get_average_distance_from_floor(self):
         """
         Returns a dictionary mapping each floor to its average travel distance.
         """
-        avg_distances = {}
-        for floor, data in self.distance_by_floor.items():
-            if data['from_count'] > 0:
-                avg_distances[floor] = data['total_from_distance'] / data['from_count']
-            else:
-                avg_distances[floor] = 0
-        return avg_distances
+        counts = self.od_matrix.sum(axis=1)
+        distances = (self.od_matrix * self.distances).sum(axis=1)
+        return self.get_floor_averages(distances, counts)
+
+    def get_floor_averages(self, totals, counts):
+        """
+        Divides per-floor totals by counts for every floor any ride started or ended at, 0 where the count is 0.
+        """
+        averages = np.divide(totals, counts, out=np.zeros(len(counts)), where=counts > 0)
+        visited = np.flatnonzero(self.od_matrix.sum(axis=0) + self.od_matrix.sum(axis=1))
+        return dict(zip(visited.tolist(), averages[visited].tolist()))
 
-    def get_hourly_heatmap(self):
+    def get_current_hour(self):
+        """Returns the number of virtual hours elapsed, the hourly bin the heatmaps are currently counting into."""
+        return int(self.clock.get_elapsed_virtual_seconds() // 3600)
+
+    def get_hourly_heatmap(self, day=None):
+        """
+        Returns the hourly ride distribution of a virtual day as a dictionary, by default of the current day.
         """
-        Returns the hourly ride distribution as a dictionary.
+        if day is None:
+            day = self.get_current_hour() // 24
+        return self.windows["1h"].get_day_counts(day)
+
+    def get_daily_heatmaps(self):
         """
-        return dict(self.ride_timestamps)
+        Returns the hourly ride distribution of every virtual day still held by the hourly window.
+        """
+        window = self.windows["1h"]
+        days = sorted({number * window.resolution // SECONDS_PER_DAY for number in window.bins if number >= 0})
+        return {day: self.get_hourly_heatmap(day) for day in days}
+
+    def get_od_matrix(self, top=TOP_PAIRS):
+        """
+        Returns the origin-destination matrix with its row and column sums and the most frequent pairs.
+        :param top: The number of origin-destination pairs with the most rides to return.
+        """
+        flat = self.od_matrix.ravel()
+        top = min(top, np.count_nonzero(flat))
+        # partition for the top pairs, then sort only those
+        pairs = np.argpartition(flat, -top)[-top:] if top else np.empty(0, dtype=np.int64)
+        pairs = pairs[np.argsort(-flat[pairs], kind="stable")]
+        return {
+            "floor_count": self.floor_count,
+            "matrix": self.od_matrix.tolist(),
+            "departures": self.od_matrix.sum(axis=1).tolist(),
+            "destinations": self.od_matrix.sum(axis=0).tolist(),
+            "top_pairs": [
+                {"start": int(pair // (self.floor_count + 1)), "end": int(pair % (self.floor_count + 1)),
+                 "rides": int(flat[pair])}
+                for pair in pairs
+            ],
+        }
+
+    def get_summary(self):
+        """
+        Returns the ride count, the average distance and the overall wait and journey times.
+        """
+        return {
+            "total_rides": self.total_rides,
+            "average_distance": self.get_average_distance(),
+            "wait_time": self.wait_times.get_summary(),
+            "journey_time": self.journey_times.get_summary(),
+        }
 
     def get(self):
         """
         Returns all statistics.
         """
         stats = {
-            "departures": dict(self.departures),
-            "destinations": dict(self.destinations),
+            "departures": self.get_floor_counts(self.od_matrix.sum(axis=1)),
+            "destinations": self.get_floor_counts(self.od_matrix.sum(axis=0)),
             "total_rides": self.total_rides,
             "hourly_heatmap": self.get_hourly_heatmap(),
+            "daily_heatmaps": self.get_daily_heatmaps(),
             "average_distance": self.get_average_distance(),
             "average_from_distance_by_floor": self.get_average_distance_from_floor(),
-            "average_to_distance_by_floor": self.get_average_distance_to_floor()
+            "average_to_distance_by_floor": self.get_average_distance_to_floor(),
+            "wait_time": self.get_time_percentiles(
+                self.wait_times, self.wait_times_by_role, self.wait_times_by_floor),
+            "journey_time": self.get_time_percentiles(
+                self.journey_times, self.journey_times_by_role, self.journey_times_by_floor)
         }
         return stats
@@ -0,0 +1,57 @@
+import argparse
+import csv
+import json
+import sys
+
+from app.simulation.sweep import run_sweep
+
+# Columns printed to the console, the output file holds every column
+TABLE_COLUMNS = [
+    "population_size", "max_load", "scale", "car_count", "population_mode", "scheduler", "role_distribution", "seed",
+    "total_rides", "delivered", "wait_p50", "wait_p90", "wait_p99", "elapsed_seconds",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs a grid of headless simulations in parallel worker processes.")
+    parser.add_argument("grid", help="JSON file mapping parameters to lists of values, plus \"seeds\" and \"days\".")
+    parser.add_argument("--workers", type=int, help="Number of worker processes, all cores by default.")
+    parser.add_argument("--output", help="File the result table is written to, as JSON if it ends in .json else as CSV.")
+    return parser.parse_args()
+
+
+def format_cell(value):
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    if isinstance(value, dict):
+        # role weights, compact so the row stays on one line
+        return json.dumps(value, separators=(",", ":"))
+    if value is None:
+        return "default"
+    return str(value)
+
+
+def main():
+    args = parse_args()
+    with open(args.grid) as grid_file:
+        grid = json.load(grid_file)
+
+    print("\t".join(TABLE_COLUMNS))
+    rows = run_sweep(grid, workers=args.workers,
+                     on_result=lambda row: print("\t".join(format_cell(row[column]) for column in TABLE_COLUMNS)))
+
+    if args.output and args.output.endswith(".json"):
+        with open(args.output, "w") as output:
+            json.dump(rows, output, indent=2)
+    elif args.output:
+        with open(args.output, "w", newline="") as output:
+            writer = csv.DictWriter(output, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({name: json.dumps(value) if isinstance(value, dict) else value
+                                 for name, value in row.items()})
+    print(f"Ran {len(rows)} configuration(s).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
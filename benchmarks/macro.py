@@ -0,0 +1,32 @@
+import time
+
+from app.simulation.engine import POPULATION_CLASSES, create_engine
+
+# Population sizes a full virtual day is simulated for
+POPULATION_SIZES = [100, 10000, 100000]
+
+
+def run_day(population_size, population_mode="vectorized", seed=0):
+    """Simulates one seeded virtual day headless and returns its timings and ride counts."""
+    started = time.perf_counter()
+    engine = create_engine(population_size=population_size, population_class=POPULATION_CLASSES[population_mode],
+                           seed=seed, log_size=0)
+    setup_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    engine.run_days(1)
+    elapsed = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_started
+
+    statistics = engine.loop.statistics.get()
+    return {
+        "name": f"full_day_{population_size}",
+        "population_size": population_size,
+        "population_mode": population_mode,
+        "setup_seconds": setup_seconds,
+        "seconds": elapsed,
+        "cpu_seconds": cpu_seconds,
+        "total_rides": statistics["total_rides"],
+        "rides_per_second": statistics["total_rides"] / elapsed if elapsed else 0,
+    }
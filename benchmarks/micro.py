@@ -0,0 +1,115 @@
+import random
+
+from app.building.building import Building
+from app.building.floordefinition import FLOOR_DEFINITION
+from app.elevator.elevator import Elevator
+from app.elevator.scheduling.elevator_scheduler import Scheduler
+from app.people.roles.office import OfficeRole
+from app.simulation.loop import Loop
+from app.simulation.stepped_clock import SteppedClock
+from app.statistics.ride_log import RideLog
+from app.statistics.statistics import Statistics
+
+MAX_LOAD = 1200
+# Waiting passengers per floor of each queue shape the scheduler is benchmarked with
+QUEUE_SHAPES = {
+    "idle": 0,
+    "sparse": 0.2,
+    "busy": 3,
+}
+
+
+def building():
+    return Building(FLOOR_DEFINITION)
+
+
+def scheduler_with_queues(waiting_per_floor):
+    """Returns a callable making one scheduler decision and carrying it out, refilling the queues once drained."""
+    floor_count = building().number_of_floors
+    elevator = Elevator(floor_count, MAX_LOAD)
+    scheduler = Scheduler(elevator, SteppedClock())
+    generator = random.Random(0)
+    request_count = int(waiting_per_floor * (floor_count + 1))
+    requests = [tuple(generator.sample(range(floor_count + 1), 2)) for _ in range(request_count)]
+
+    def decide():
+        if not scheduler.has_pending_requests():
+            for start, end in requests:
+                scheduler.handle_request(start, end)
+        Loop.actuate(elevator, scheduler.get_next_move())
+
+    return decide
+
+
+def role_requests():
+    """Returns a callable asking a single office worker for a request, one virtual minute later each call."""
+    role = OfficeRole(building())
+    clock = SteppedClock(scale=60)
+
+    def request():
+        clock.advance(1)
+        role.get_next_request(clock)
+
+    return request
+
+
+def statistics_tracking():
+    floor_count = building().number_of_floors
+    statistics = Statistics(SteppedClock(), floor_count)
+    generator = random.Random(0)
+    rides = [tuple(generator.sample(range(floor_count + 1), 2)) for _ in range(1024)]
+    position = 0
+
+    def track():
+        nonlocal position
+        position = (position + 1) % len(rides)
+        statistics.track_ride(*rides[position])
+
+    return track
+
+
+def ride_logging():
+    ride_log = RideLog(SteppedClock())
+
+    def log():
+        ride_log.log_ride(0, 5, "a1b2c3", "OfficeRole")
+
+    return log
+
+
+def busy_car(target):
+    """Returns the elevator or the scheduler of a car that has queued, boarded and moved passengers."""
+    floor_count = building().number_of_floors
+    elevator = Elevator(floor_count, MAX_LOAD)
+    scheduler = Scheduler(elevator, SteppedClock())
+    generator = random.Random(0)
+    for _ in range(3 * (floor_count + 1)):
+        scheduler.handle_request(*generator.sample(range(floor_count + 1), 2))
+    for _ in range(8):
+        Loop.actuate(elevator, scheduler.get_next_move())
+    subject = elevator if target == "elevator" else scheduler
+    return subject
+
+
+def string_rendering(target):
+    subject = busy_car(target)
+    return lambda: str(subject)
+
+
+def state_serialization(target):
+    subject = busy_car(target)
+    return subject.get_state
+
+
+# Benchmark names mapped to setup functions returning the callable that is timed
+BENCHMARKS = {
+    **{f"scheduler_decision_{shape}": (lambda waiting=waiting: scheduler_with_queues(waiting))
+       for shape, waiting in QUEUE_SHAPES.items()},
+    "role_get_next_request": role_requests,
+    "statistics_track_ride": statistics_tracking,
+    "ride_log_log_ride": ride_logging,
+    "elevator_str": lambda: string_rendering("elevator"),
+    "scheduler_str": lambda: string_rendering("scheduler"),
+    "elevator_get_state": lambda: state_serialization("elevator"),
+    "scheduler_get_state": lambda: state_serialization("scheduler"),
+}
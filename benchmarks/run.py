@@ -0,0 +1,100 @@
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+
+from app.simulation.engine import POPULATION_CLASSES
+from benchmarks.macro import POPULATION_SIZES, run_day
+from benchmarks.micro import BENCHMARKS
+
+# Relative slowdown against a baseline reported as a regression
+REGRESSION_THRESHOLD = 0.2
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks the simulation hot paths and full simulated days.")
+    parser.add_argument("--only", action="append", help="Run only benchmarks whose name contains this text.")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the micro benchmarks.")
+    parser.add_argument("--skip-macro", action="store_true", help="Skip the full day benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=POPULATION_SIZES,
+                        help="Population sizes of the full day benchmarks.")
+    parser.add_argument("--population-mode", choices=POPULATION_CLASSES.keys(), default="vectorized",
+                        help="How the population of the full day benchmarks is evaluated.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per micro benchmark, the best is kept.")
+    parser.add_argument("--output", help="File the results are written to as JSON, stdout by default.")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against.")
+    return parser.parse_args()
+
+
+def selected(name, only):
+    return only is None or any(text in name for text in only)
+
+
+def run_micro(name, setup, repeat):
+    """Times a micro benchmark in rounds of about 0.2 seconds and reports the fastest round per call."""
+    timer = timeit.Timer(setup())
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"name": name, "kind": "micro", "calls": number, "ns_per_call": best * 1e9}
+
+
+def find_regressions(results, baseline):
+    """Returns a line for every benchmark that got slower than the baseline by more than the threshold."""
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        metric = "ns_per_call" if result["kind"] == "micro" else "seconds"
+        change = result[metric] / before[metric] - 1
+        if change > REGRESSION_THRESHOLD:
+            regressions.append(f"{result['name']}: {before[metric]:.1f} -> {result[metric]:.1f} {metric} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    results = []
+    if not args.skip_micro:
+        for name, setup in BENCHMARKS.items():
+            if selected(name, args.only):
+                results.append(run_micro(name, setup, args.repeat))
+                print(f"{name}: {results[-1]['ns_per_call']:.0f} ns", file=sys.stderr)
+    if not args.skip_macro:
+        for size in args.sizes:
+            if selected(f"full_day_{size}", args.only):
+                result = run_day(size, args.population_mode)
+                result["kind"] = "macro"
+                results.append(result)
+                print(f"{result['name']}: {result['seconds']:.2f} s", file=sys.stderr)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = find_regressions(results, json.load(baseline_file))
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()